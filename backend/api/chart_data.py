@@ -7,6 +7,8 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import Optional, List
 from datetime import datetime
 
+import numpy as np
+
 from .config import settings
 from ..models.market_data import ChartDataResponse, OHLCVCandle
 from ..bridges.resonance_bridge import ResonanceBridge, get_resonance_bridge
@@ -14,6 +16,9 @@ from ..bridges.tradingview_bridge import TradingViewBridge
 
 router = APIRouter()
 
+# Noise source for the mock ML predictions
+_rng = np.random.default_rng()
+
 
 def _normalize_symbol_for_resonance(symbol: str) -> str:
     """
@@ -274,49 +279,35 @@ def _find_nearest_candle_time(alert_time: int, candle_times: List[int], candle_t
     return None
 
 
+def _line_points(times: List[int], values: np.ndarray) -> List[dict]:
+    """Pair candle times with values as TradingView line points"""
+    return [{"time": t, "value": v} for t, v in zip(times, values.tolist())]
+
+
 def _generate_ml_predictions(candles: List[OHLCVCandle]) -> dict:
     """
     Generate mock ML predictions for demonstration
     In production, this would call actual ML models from strategy_engine.py
     """
-    import random
-
     if len(candles) < 20:
         return None
 
     # Get last 20 candles for prediction context
     recent_candles = candles[-20:]
-    last_close = recent_candles[-1].close
-
-    # Generate prediction line (mock trend continuation with some variance)
-    prediction_data = []
-    confidence_upper = []
-    confidence_lower = []
+    times = [candle.time for candle in recent_candles]
+    closes = np.array([candle.close for candle in recent_candles])
 
-    for i, candle in enumerate(recent_candles):
-        # Mock prediction: slight upward trend with random walk
-        trend_factor = 1 + (i * 0.001)  # 0.1% increase per candle
-        noise = random.uniform(-0.01, 0.01)  # ±1% random noise
+    # Mock prediction: slight upward trend (0.1% per candle) with ±1% random noise
+    trend_factor = 1 + np.arange(len(closes)) * 0.001
+    noise = _rng.uniform(-0.01, 0.01, len(closes))
+    predicted = closes * trend_factor * (1 + noise)
 
-        predicted_value = candle.close * trend_factor * (1 + noise)
+    # Confidence band (±2% around prediction)
+    confidence_range = predicted * 0.02
 
-        # Confidence band (±2% around prediction)
-        confidence_range = predicted_value * 0.02
-
-        prediction_data.append({
-            "time": candle.time,
-            "value": predicted_value
-        })
-
-        confidence_upper.append({
-            "time": candle.time,
-            "value": predicted_value + confidence_range
-        })
-
-        confidence_lower.append({
-            "time": candle.time,
-            "value": predicted_value - confidence_range
-        })
+    prediction_data = _line_points(times, predicted)
+    confidence_upper = _line_points(times, predicted + confidence_range)
+    confidence_lower = _line_points(times, predicted - confidence_range)
 
     return {
         "ml_prediction": {
@@ -4,13 +4,17 @@ Paper Trading API Endpoints
 RESTful API for virtual portfolio management
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Request
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import unquote
+import posixpath
+import re
 import httpx
 
 from ..models.paper_trading import (
     Portfolio, PortfolioSummary, Order, Position, Trade,
-    CreatePortfolioRequest, CreateOrderRequest, OrderStatus
+    CreatePortfolioRequest, CreateOrderRequest, CreateOrderResponse, OrderStatus,
+    BatchSubRequest, BatchSubResponse
 )
 from ..services.paper_trading_service import get_paper_trading_service
 
@@ -57,13 +61,14 @@ async def delete_portfolio(portfolio_id: str):
 
 # Order Endpoints
 
-@router.post("/portfolios/{portfolio_id}/orders", response_model=Order, status_code=201)
+@router.post("/portfolios/{portfolio_id}/orders", response_model=CreateOrderResponse, status_code=201)
 async def create_order(portfolio_id: str, request: CreateOrderRequest):
     """
     Create a new order
 
     The order will be executed immediately if it's a market order,
-    or when the price conditions are met for limit/stop orders
+    or when the price conditions are met for limit/stop orders.
+    The response includes the portfolio's cash balance after execution.
     """
     service = get_paper_trading_service()
 
@@ -132,17 +137,13 @@ async def list_positions(portfolio_id: str):
     if not positions:
         return []
 
-    # Fetch current prices for all position symbols
-    symbols = set()
-    for position_id in positions:
-        if position_id in service.positions:
-            symbols.add(service.positions[position_id].symbol)
-
-    current_prices = {}
-    for symbol in symbols:
-        price = await _fetch_current_price(symbol)
-        if price:
-            current_prices[symbol] = price
+    # Fetch current prices for all position symbols in one request
+    symbols = {
+        service.positions[position_id].symbol
+        for position_id in positions
+        if position_id in service.positions
+    }
+    current_prices = await _fetch_current_prices(symbols)
 
     return service.list_positions(portfolio_id, current_prices)
 
@@ -179,8 +180,102 @@ async def list_trades(
     return service.list_trades(portfolio_id, limit)
 
 
+# Batch Endpoint
+
+_BATCH_REFERENCE_RE = re.compile(r"\{(\d+)\.(\w+)\}")
+
+# Values substituted into a step's path must be a single plain path segment
+_BATCH_SEGMENT_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+# Steps per /batch call; each one is a full in-process request
+_MAX_BATCH_STEPS = 50
+
+
+def _batch_path(prefix: str, path: str, step: int) -> str:
+    """
+    Join a batch step's path onto the paper trading prefix
+
+    Raises:
+        HTTPException: 400 if the path could leave the paper trading API
+    """
+    route = unquote(path.split("?", 1)[0])
+    if (
+        not route.startswith("/")
+        or ".." in route
+        or "//" in route
+        or "\\" in route
+        or not posixpath.normpath(prefix + route).startswith(prefix + "/")
+    ):
+        raise HTTPException(status_code=400, detail=f"Invalid path in batch step {step}")
+    return prefix + path
+
+
+@router.post("/batch", response_model=List[BatchSubResponse])
+async def batch(
+    http_request: Request,
+    steps: List[BatchSubRequest] = Body(..., max_length=_MAX_BATCH_STEPS)
+):
+    """
+    Run several paper trading requests in one round-trip
+
+    Steps run in order against this app in-process. A step's path may use
+    {index.field} to insert a field from an earlier step's response body,
+    so e.g. a portfolio can be created and traded in the same batch.
+    Paths must stay within the paper trading API, and a batch may hold at
+    most _MAX_BATCH_STEPS steps.
+    """
+    results: List[BatchSubResponse] = []
+    prefix = http_request.url.path.rsplit("/batch", 1)[0]
+    client_address = (http_request.client.host, http_request.client.port) if http_request.client else ("127.0.0.1", 0)
+
+    def resolve(match: re.Match) -> str:
+        index, field = int(match.group(1)), match.group(2)
+        if index >= len(results) or not isinstance(results[index].body, dict) or field not in results[index].body:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot resolve {match.group(0)} in batch step {len(results)}"
+            )
+        value = str(results[index].body[field])
+        if not _BATCH_SEGMENT_RE.fullmatch(value):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot use {match.group(0)} as a path segment in batch step {len(results)}"
+            )
+        return value
+
+    transport = httpx.ASGITransport(app=http_request.app, client=client_address)
+    async with httpx.AsyncClient(transport=transport, base_url=str(http_request.base_url)) as client:
+        for sub_request in steps:
+            path = _BATCH_REFERENCE_RE.sub(resolve, sub_request.path)
+            response = await client.request(
+                sub_request.method,
+                _batch_path(prefix, path, len(results)),
+                json=sub_request.body
+            )
+            results.append(BatchSubResponse(
+                status_code=response.status_code,
+                body=response.json() if response.content else None
+            ))
+
+    return results
+
+
 # Market Data Helper
 
+_COINGECKO_IDS = {
+    "BTC/USD": "bitcoin",
+    "ETH/USD": "ethereum",
+    "BNB/USD": "binancecoin",
+    "ADA/USD": "cardano",
+    "SOL/USD": "solana",
+}
+
+
+def _coingecko_id(symbol: str) -> str:
+    """Map a trading pair (e.g. "BTC/USD") to its CoinGecko coin ID"""
+    return _COINGECKO_IDS.get(symbol, symbol.split("/")[0].lower())
+
+
 async def _fetch_current_price(symbol: str) -> Optional[float]:
     """
     Fetch current market price for a symbol
@@ -188,23 +283,26 @@ async def _fetch_current_price(symbol: str) -> Optional[float]:
     Uses CoinGecko API as fallback data source
     In production, this would use the broker API or real-time data feed
     """
-    try:
-        # Parse symbol (e.g., "BTC/USD" -> "bitcoin")
-        coin_id_map = {
-            "BTC/USD": "bitcoin",
-            "ETH/USD": "ethereum",
-            "BNB/USD": "binancecoin",
-            "ADA/USD": "cardano",
-            "SOL/USD": "solana",
-        }
+    prices = await _fetch_current_prices([symbol])
+    return prices.get(symbol)
+
 
-        coin_id = coin_id_map.get(symbol, symbol.split("/")[0].lower())
+async def _fetch_current_prices(symbols: Iterable[str]) -> Dict[str, float]:
+    """
+    Fetch current market prices for several symbols in one CoinGecko request
 
+    Symbols without a price in the response are left out of the result.
+    """
+    coin_ids = {symbol: _coingecko_id(symbol) for symbol in symbols}
+    if not coin_ids:
+        return {}
+
+    try:
         async with httpx.AsyncClient() as client:
             response = await client.get(
-                f"https://api.coingecko.com/api/v3/simple/price",
+                "https://api.coingecko.com/api/v3/simple/price",
                 params={
-                    "ids": coin_id,
+                    "ids": ",".join(sorted(set(coin_ids.values()))),
                     "vs_currencies": "usd"
                 },
                 timeout=5.0
@@ -212,12 +310,17 @@ async def _fetch_current_price(symbol: str) -> Optional[float]:
 
             if response.status_code == 200:
                 data = response.json()
-                return data.get(coin_id, {}).get("usd")
+                prices = {}
+                for symbol, coin_id in coin_ids.items():
+                    price = data.get(coin_id, {}).get("usd")
+                    if price:
+                        prices[symbol] = price
+                return prices
 
     except Exception as e:
-        print(f"Error fetching price for {symbol}: {e}")
+        print(f"Error fetching prices for {', '.join(coin_ids)}: {e}")
 
-    return None
+    return {}
 
 
 # Webhook for price updates (background task)
@@ -233,17 +336,10 @@ async def update_market_prices():
     service = get_paper_trading_service()
 
     # Get all unique symbols from pending orders
-    symbols = set()
-    for order in service.orders.values():
-        if order.status == OrderStatus.PENDING:
-            symbols.add(order.symbol)
-
-    # Fetch current prices
-    prices = {}
-    for symbol in symbols:
-        price = await _fetch_current_price(symbol)
-        if price:
-            prices[symbol] = price
+    symbols = {symbol for symbol, book in service.pending_books.items() if len(book)}
+
+    # Fetch current prices in one request
+    prices = await _fetch_current_prices(symbols)
 
     # Update and get executed orders
     executed_orders = service.update_market_prices(prices)
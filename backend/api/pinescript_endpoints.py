@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import pandas as pd
 import numpy as np
+from dataclasses import asdict
 from datetime import datetime
 
 from ..pine2py.translator import translate
@@ -114,8 +115,11 @@ async def execute_pinescript(request: PineScriptExecuteRequest):
         # 5. Format response
         return ExecutionResponse(
             success=True,
-            orders=result.get("orders", []),
-            positions=result.get("positions", []),
+            orders=[
+                {**asdict(order), "time": int(df["time"].iloc[order.bar]) if order.bar is not None else None}
+                for order in result.get("orders", [])
+            ],
+            positions=[{"id": position_id, "qty": qty} for position_id, qty in result.get("positions", {}).items()],
             indicators=result.get("indicators", {})
         )
 
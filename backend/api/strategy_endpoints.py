@@ -4,19 +4,46 @@ Strategy Execution and Backtesting API
 Allows users to write custom Python strategies and backtest them
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Union
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import httpx
+import asyncio
+import builtins
 import io
 import sys
+from functools import lru_cache
+from types import CodeType
 from contextlib import redirect_stdout, redirect_stderr
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    orjson = None
+
+# Backtest results carry one entry per trade; orjson encodes them far faster
+_BacktestResponse = ORJSONResponse if orjson is not None else JSONResponse
+
 router = APIRouter()
 
+# pandas >= 3 always uses Copy-on-Write, so a shallow copy shares the candle
+# buffers with the caller and only copies columns a strategy actually modifies
+_PANDAS_COPY_ON_WRITE = int(pd.__version__.split(".", 1)[0]) >= 3
+
+# /backtest/batch limits: backtests per call, and historical data fetches in flight at once
+_MAX_BATCH_BACKTESTS = 50
+_MAX_CONCURRENT_FETCHES = 4
+
 
 class BacktestRequest(BaseModel):
     strategy_code: str = Field(..., description="Python strategy code")
@@ -48,7 +75,7 @@ class BacktestResult(BaseModel):
     trades: List[Trade]
 
 
-@router.post("/backtest", response_model=BacktestResult)
+@router.post("/backtest", response_model=BacktestResult, response_class=_BacktestResponse)
 async def backtest_strategy(request: BacktestRequest):
     """
     Execute a custom strategy against historical data
@@ -70,40 +97,86 @@ async def backtest_strategy(request: BacktestRequest):
             request.end_date
         )
 
-        if data.empty:
-            raise HTTPException(
-                status_code=400,
-                detail="No historical data available for the specified period"
-            )
+        return _run_backtest(request, data)
 
-        # Execute strategy in a controlled environment
-        signals = _execute_strategy(request.strategy_code, data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Backtest failed: {str(e)}"
+        )
 
-        if not signals:
-            return BacktestResult(
-                total_trades=0,
-                winning_trades=0,
-                losing_trades=0,
-                win_rate=0.0,
-                total_return=0.0,
-                total_return_percent=0.0,
-                sharpe_ratio=0.0,
-                max_drawdown=0.0,
-                avg_trade_return=0.0,
-                trades=[]
+
+@router.post(
+    "/backtest/batch",
+    response_model=List[BacktestResult],
+    response_class=_BacktestResponse
+)
+async def backtest_strategies(
+    requests: List[BacktestRequest] = Body(..., max_length=_MAX_BATCH_BACKTESTS)
+):
+    """
+    Run several backtests in one call, e.g. a strategy across symbols or parameter sets
+
+    Historical data is fetched once per distinct symbol/timeframe/date range,
+    with up to _MAX_CONCURRENT_FETCHES fetches running concurrently. Backtests
+    then run serially off the event loop. Results are returned in request order.
+    """
+    keys = [(r.symbol, r.timeframe, r.start_date, r.end_date) for r in requests]
+    unique_keys = list(dict.fromkeys(keys))
+    fetch_slots = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+
+    async def fetch(key):
+        async with fetch_slots:
+            return await _fetch_historical_data(*key)
+
+    frames = await asyncio.gather(*(fetch(key) for key in unique_keys))
+    data_by_key = dict(zip(unique_keys, frames))
+
+    # Backtests are CPU-bound, so each runs in a worker thread to keep the event
+    # loop responsive. They run one at a time rather than gathered: the
+    # strategy's stdout/stderr capture swaps the process-wide sys.stdout, which
+    # concurrent backtests would interleave
+    results = []
+    for index, (request, key) in enumerate(zip(requests, keys)):
+        try:
+            results.append(await asyncio.to_thread(_run_backtest, request, data_by_key[key]))
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Backtest {index} failed: {str(e)}"
             )
 
-        # Simulate trades and calculate performance
-        result = _simulate_trades(signals, data, request.initial_balance)
+    return results
 
-        return result
 
-    except Exception as e:
+def _run_backtest(request: BacktestRequest, data: pd.DataFrame) -> BacktestResult:
+    """Run a strategy over already-fetched historical data"""
+    if data.empty:
         raise HTTPException(
             status_code=400,
-            detail=f"Backtest failed: {str(e)}"
+            detail="No historical data available for the specified period"
+        )
+
+    # Execute strategy in a controlled environment
+    signals = _execute_strategy(request.strategy_code, data)
+
+    if len(signals) == 0:
+        return BacktestResult(
+            total_trades=0,
+            winning_trades=0,
+            losing_trades=0,
+            win_rate=0.0,
+            total_return=0.0,
+            total_return_percent=0.0,
+            sharpe_ratio=0.0,
+            max_drawdown=0.0,
+            avg_trade_return=0.0,
+            trades=[]
         )
 
+    # Simulate trades and calculate performance
+    return _simulate_trades(signals, data, request.initial_balance)
+
 
 async def _fetch_historical_data(
     symbol: str,
@@ -210,52 +283,65 @@ async def _fetch_historical_data(
         return pd.DataFrame()
 
 
-def _execute_strategy(code: str, data: pd.DataFrame) -> List[Dict]:
+def _safe_import(name, *args, **kwargs):
+    """Only allow importing pandas and numpy"""
+    allowed_modules = {
+        'pandas': pd,
+        'numpy': np,
+        'np': np,
+        'pd': pd
+    }
+    if name in allowed_modules:
+        return allowed_modules[name]
+    raise ImportError(f"Import of '{name}' is not allowed in strategy code")
+
+
+# Restricted builtins for strategy code, built once at import
+_SAFE_BUILTINS = {k: getattr(builtins, k) for k in dir(builtins) if not k.startswith('_')}
+
+# Override dangerous functions
+_SAFE_BUILTINS['__import__'] = _safe_import
+_SAFE_BUILTINS['open'] = None  # Disable file operations
+_SAFE_BUILTINS['eval'] = None  # Disable eval
+_SAFE_BUILTINS['exec'] = None  # Disable exec
+_SAFE_BUILTINS['compile'] = None  # Disable compile
+_SAFE_BUILTINS['__loader__'] = None
+_SAFE_BUILTINS['__spec__'] = None
+
+
+@lru_cache(maxsize=128)
+def _compile_strategy(code: str) -> CodeType:
+    """Compile strategy source once; reruns of the same strategy reuse the code object"""
+    return compile(code, "<strategy>", "exec")
+
+
+def _execute_strategy(code: str, data: pd.DataFrame) -> Union[List[Dict], np.ndarray]:
     """
     Execute user strategy code in a controlled environment
 
+    The strategy function is called once with the full candle frame and may
+    return either a list of {"time", "side", "quantity"} signal dicts, or a
+    1-D numeric or boolean array (or Series) with one entry per candle:
+    +1 buy, -1 sell, 0 or NaN hold.
+
     WARNING: This is a simplified implementation.
     Production should use proper sandboxing!
     """
 
-    # Create a restricted import function
-    def safe_import(name, *args, **kwargs):
-        """Only allow importing pandas and numpy"""
-        allowed_modules = {
-            'pandas': pd,
-            'numpy': np,
-            'np': np,
-            'pd': pd
-        }
-        if name in allowed_modules:
-            return allowed_modules[name]
-        raise ImportError(f"Import of '{name}' is not allowed in strategy code")
-
-    # Create a restricted globals environment with full builtins
-    import builtins
-    safe_builtins = {k: getattr(builtins, k) for k in dir(builtins) if not k.startswith('_')}
-
-    # Override dangerous functions
-    safe_builtins['__import__'] = safe_import
-    safe_builtins['open'] = None  # Disable file operations
-    safe_builtins['eval'] = None  # Disable eval
-    safe_builtins['exec'] = None  # Disable exec
-    safe_builtins['compile'] = None  # Disable compile
-    safe_builtins['__loader__'] = None
-    safe_builtins['__spec__'] = None
-
     safe_globals = {
         "pd": pd,
         "np": np,
         "pandas": pd,
         "numpy": np,
-        "__builtins__": safe_builtins,
+        # Fresh copy per run so a strategy can't alter builtins for later runs
+        "__builtins__": dict(_SAFE_BUILTINS),
         "__name__": "__main__",
         "__doc__": None,
     }
 
-    # Create a copy of data to prevent modifications
-    data_copy = data.copy()
+    # Give the strategy its own frame so it can't modify the caller's data;
+    # under Copy-on-Write this is a zero-copy view until the strategy writes
+    data_copy = data.copy(deep=not _PANDAS_COPY_ON_WRITE)
 
     try:
         # Capture stdout/stderr to prevent information leakage
@@ -264,7 +350,7 @@ def _execute_strategy(code: str, data: pd.DataFrame) -> List[Dict]:
 
         with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
             # Execute the strategy code
-            exec(code, safe_globals)
+            exec(_compile_strategy(code), safe_globals)
 
             # Call the strategy function
             if "strategy" not in safe_globals:
@@ -273,8 +359,21 @@ def _execute_strategy(code: str, data: pd.DataFrame) -> List[Dict]:
             strategy_func = safe_globals["strategy"]
             signals = strategy_func(data_copy)
 
+            if isinstance(signals, pd.Series):
+                signals = signals.to_numpy()
+
+            if isinstance(signals, np.ndarray):
+                if signals.ndim != 1 or len(signals) != len(data_copy):
+                    raise ValueError("Signal array must have exactly one entry per candle")
+                if signals.dtype == np.bool_:
+                    return signals.astype(np.int8)
+                if not (np.issubdtype(signals.dtype, np.integer) or np.issubdtype(signals.dtype, np.floating)):
+                    raise ValueError(f"Signal array must be numeric or boolean, got dtype {signals.dtype}")
+                # NaN (e.g. the first entry of .diff()) means no signal
+                return np.nan_to_num(signals, nan=0.0, posinf=1.0, neginf=-1.0)
+
             if not isinstance(signals, list):
-                raise ValueError("Strategy must return a list of signals")
+                raise ValueError("Strategy must return a list of signals or a signal array")
 
             return signals
 
@@ -282,37 +381,81 @@ def _execute_strategy(code: str, data: pd.DataFrame) -> List[Dict]:
         raise ValueError(f"Strategy execution error: {str(e)}")
 
 
-def _simulate_trades(
-    signals: List[Dict],
-    data: pd.DataFrame,
-    initial_balance: float
-) -> BacktestResult:
-    """
-    Simulate trades based on strategy signals and calculate performance metrics
+def _signal_arrays(
+    signals: Union[List[Dict], np.ndarray],
+    data: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
+    Normalize strategy output into parallel arrays, one entry per signal
 
-    balance = initial_balance
-    position = 0.0  # Current position size
-    position_value = 0.0  # Value when position was opened
-    trades = []
-    equity_curve = [initial_balance]
+    Returns:
+        (times, sides, quantities, prices) where sides is +1 buy, -1 sell,
+        0 for anything else, and prices is NaN when no candle matches the time
+    """
+    if isinstance(signals, np.ndarray):
+        # Array signals are aligned with candles: walk only the non-hold bars
+        idx = np.flatnonzero(signals)
+        return (
+            data["time"].to_numpy()[idx],
+            np.sign(signals[idx]).astype(np.int8),
+            np.ones(len(idx)),
+            data["close"].to_numpy(dtype=float)[idx]
+        )
 
-    # Create price lookup
     price_map = dict(zip(data["time"], data["close"]))
+    side_codes = {"buy": 1, "sell": -1}
+
+    # Fill all four arrays in a single forward pass over the signals
+    n = len(signals)
+    times = np.empty(n, dtype=object)
+    sides = np.empty(n, dtype=np.int8)
+    quantities = np.empty(n)
+    prices = np.empty(n)
 
-    for signal in signals:
+    for i, signal in enumerate(signals):
         timestamp = signal.get("time")
-        side = signal.get("side")
-        quantity = signal.get("quantity", 1.0)
+        times[i] = timestamp
+        sides[i] = side_codes.get(signal.get("side"), 0)
+        quantities[i] = signal.get("quantity", 1.0)
+        prices[i] = price_map.get(timestamp, np.nan)
 
-        # Get price at signal time
-        price = price_map.get(timestamp)
-        if price is None:
-            continue
+    return times, sides, quantities, prices
 
-        pnl = 0.0
 
-        if side == "buy":
+def _walk_fills(
+    sides: np.ndarray,
+    quantities: np.ndarray,
+    prices: np.ndarray,
+    initial_balance: float
+):
+    """
+    Walk signals in order, filling buys and sells against a long-only position
+
+    Fills are path dependent (each depends on the balance and position left by
+    the previous one), so this is a scalar loop over preallocated arrays,
+    compiled with numba when it is installed. Prices must not contain NaN.
+
+    Returns:
+        (equity_curve, trade_index, trade_pnl, balance, position) where
+        trade_index holds the signal index of each closing sell
+    """
+    n = len(sides)
+    equity_curve = np.empty(n + 1)
+    equity_curve[0] = initial_balance
+    n_equity = 1
+    trade_index = np.empty(n, dtype=np.int64)
+    trade_pnl = np.empty(n)
+    n_trades = 0
+
+    balance = initial_balance
+    position = 0.0  # Current position size
+    position_value = 0.0  # Value when position was opened
+
+    for i in range(n):
+        price = prices[i]
+        quantity = quantities[i]
+
+        if sides[i] > 0:
             if balance >= price * quantity:
                 # Open long position
                 cost = price * quantity
@@ -320,29 +463,65 @@ def _simulate_trades(
                 position += quantity
                 position_value += cost
 
-        elif side == "sell":
+        elif sides[i] < 0:
             if position >= quantity:
                 # Close long position
                 revenue = price * quantity
                 cost_basis = (position_value / position) * quantity
 
-                pnl = revenue - cost_basis
-
                 balance += revenue
                 position -= quantity
                 position_value -= cost_basis
 
-                trades.append(Trade(
-                    timestamp=timestamp,
-                    side=side,
-                    price=price,
-                    quantity=quantity,
-                    pnl=pnl
-                ))
+                trade_index[n_trades] = i
+                trade_pnl[n_trades] = revenue - cost_basis
+                n_trades += 1
 
         # Track equity
-        current_equity = balance + (position * price)
-        equity_curve.append(current_equity)
+        equity_curve[n_equity] = balance + position * price
+        n_equity += 1
+
+    return equity_curve[:n_equity], trade_index[:n_trades], trade_pnl[:n_trades], balance, position
+
+
+if njit is not None:
+    _walk_fills = njit(cache=True)(_walk_fills)
+
+
+def _simulate_trades(
+    signals: Union[List[Dict], np.ndarray],
+    data: pd.DataFrame,
+    initial_balance: float
+) -> BacktestResult:
+    """
+    Simulate trades based on strategy signals and calculate performance metrics
+    """
+
+    times, sides, quantities, prices = _signal_arrays(signals, data)
+
+    # Drop signals with no candle at that time up front, so the fill loop
+    # never sees NaN prices
+    matched = ~np.isnan(prices)
+    if not matched.all():
+        times, sides, quantities, prices = (
+            times[matched], sides[matched], quantities[matched], prices[matched]
+        )
+
+    equity_curve, trade_index, trade_pnl, balance, position = _walk_fills(
+        sides, quantities, prices, float(initial_balance)
+    )
+
+    # Trades stay as parallel arrays until here; gather each column once and
+    # skip per-trade validation since every field is already the right type
+    trades = [
+        Trade.model_construct(timestamp=t, side="sell", price=p, quantity=q, pnl=pnl)
+        for t, p, q, pnl in zip(
+            times[trade_index].astype(np.int64).tolist(),
+            prices[trade_index].tolist(),
+            quantities[trade_index].tolist(),
+            trade_pnl.tolist()
+        )
+    ]
 
     # Calculate final equity (close any remaining positions at last price)
     final_price = data["close"].iloc[-1]
@@ -356,24 +535,25 @@ def _simulate_trades(
     total_return = final_equity - initial_balance
     total_return_percent = (total_return / initial_balance) * 100
 
-    winning_trades = sum(1 for t in trades if t.pnl > 0)
-    losing_trades = sum(1 for t in trades if t.pnl < 0)
-    total_trades = len(trades)
+    winning_trades = int(np.count_nonzero(trade_pnl > 0))
+    losing_trades = int(np.count_nonzero(trade_pnl < 0))
+    total_trades = len(trade_pnl)
 
     win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
     avg_trade_return = total_return / total_trades if total_trades > 0 else 0
 
     # Calculate Sharpe ratio (simplified)
-    if len(equity_curve) > 1:
-        returns = pd.Series(equity_curve).pct_change().dropna()
-        sharpe_ratio = (returns.mean() / returns.std() * np.sqrt(252)) if returns.std() > 0 else 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(equity_curve) / equity_curve[:-1]
+    returns = returns[~np.isnan(returns)]
+    if len(returns) > 1 and returns.std(ddof=1) > 0:
+        sharpe_ratio = returns.mean() / returns.std(ddof=1) * np.sqrt(252)
     else:
         sharpe_ratio = 0
 
     # Calculate max drawdown
-    equity_series = pd.Series(equity_curve)
-    running_max = equity_series.expanding().max()
-    drawdown = (equity_series - running_max) / running_max * 100
+    running_max = np.maximum.accumulate(equity_curve)
+    drawdown = (equity_curve - running_max) / running_max * 100
     max_drawdown = drawdown.min()
 
     return BacktestResult(
@@ -418,6 +598,29 @@ class ExecuteStrategyRequest(BaseModel):
     timeframe: str = Field(default="1h", description="Timeframe")
 
 
+def _unix_seconds(times: List) -> List[int]:
+    """
+    Convert signal times to Unix timestamps (seconds) in one pass
+
+    Numbers are truncated to int and pandas Timestamps / datetimes are
+    converted together (naive values are taken as UTC, as pandas does).
+    Mixed lists fall back to converting each value.
+    """
+    if not times:
+        return []
+
+    index = pd.Index(times)
+    if isinstance(index, pd.DatetimeIndex):
+        return (index.as_unit("ns").asi8 // 10**9).tolist()
+    if pd.api.types.is_numeric_dtype(index.dtype):
+        return index.to_numpy().astype(np.int64).tolist()
+
+    return [
+        int(t.timestamp()) if hasattr(t, "timestamp") else int(t)
+        for t in times
+    ]
+
+
 @router.post("/execute")
 async def execute_strategy(request: ExecuteStrategyRequest):
     """
@@ -446,32 +649,35 @@ async def execute_strategy(request: ExecuteStrategyRequest):
         # Execute strategy
         signals = _execute_strategy(request.strategy_code, data)
 
+        if isinstance(signals, np.ndarray):
+            idx = np.flatnonzero(signals)
+            signals = [
+                {"time": int(t), "side": "buy" if v > 0 else "sell"}
+                for t, v in zip(data["time"].to_numpy()[idx], signals[idx])
+            ]
+
         if not signals:
             return {"signals": [], "count": 0}
 
         # Format signals for chart markers
-        markers = []
-        for signal in signals:
-            time_val = signal.get("time")
-            side = signal.get("side")
-
-            if time_val and side:
-                # Convert pandas Timestamp to Unix timestamp (seconds)
-                if hasattr(time_val, 'timestamp'):
-                    # pandas Timestamp or datetime object
-                    time_unix = int(time_val.timestamp())
-                else:
-                    # Already a number (int or float)
-                    time_unix = int(time_val)
-
-                markers.append({
-                    "time": time_unix,
-                    "position": "belowBar" if side == "buy" else "aboveBar",
-                    "color": "#00ff00" if side == "buy" else "#ff0000",
-                    "shape": "arrowUp" if side == "buy" else "arrowDown",
-                    "text": side.upper(),
-                    "signal_type": side
-                })
+        valid = [
+            (signal.get("time"), signal.get("side"))
+            for signal in signals
+            if signal.get("time") and signal.get("side")
+        ]
+        times_unix = _unix_seconds([time_val for time_val, _ in valid])
+
+        markers = [
+            {
+                "time": time_unix,
+                "position": "belowBar" if side == "buy" else "aboveBar",
+                "color": "#00ff00" if side == "buy" else "#ff0000",
+                "shape": "arrowUp" if side == "buy" else "arrowDown",
+                "text": side.upper(),
+                "signal_type": side
+            }
+            for time_unix, (_, side) in zip(times_unix, valid)
+        ]
 
         return {
             "signals": markers,
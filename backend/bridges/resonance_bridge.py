@@ -9,11 +9,15 @@ Architecture:
 - Graceful degradation if service unavailable
 """
 
-import aiohttp
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+import weakref
+from collections import OrderedDict
+from typing import Annotated, List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from pydantic import BaseModel, ValidationError
+
+import httpx
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 
 from ..api.config import settings
 
@@ -23,15 +27,38 @@ class ResonanceAlert(BaseModel):
     Fixed schema for Resonance.ai v13 alerts
     Any deviation raises ValidationError, preventing silent breakage
     """
+    model_config = ConfigDict(frozen=True)
+
     time: int  # Unix timestamp
     symbol: str
     signal: str  # "breakout", "breakdown", "support", "resistance"
-    confidence: float  # 0.0 - 1.0
+    confidence: Annotated[float, Field(ge=0.0, le=1.0)]
     price: Optional[float] = None
     volume: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
+# Validates a whole alerts payload in a single pydantic-core call
+_ALERTS_ADAPTER = TypeAdapter(List[ResonanceAlert])
+
+# Live alerts keyed by (time, symbol, signal), so overlapping polls share objects
+_ALERT_INTERN: "weakref.WeakValueDictionary[Tuple[int, str, str], ResonanceAlert]" = weakref.WeakValueDictionary()
+
+
+def _intern_alerts(alerts: List[ResonanceAlert]) -> List[ResonanceAlert]:
+    """Replace each alert with an identical one already in memory, if any"""
+    interned = []
+    for alert in alerts:
+        key = (alert.time, alert.symbol, alert.signal)
+        existing = _ALERT_INTERN.get(key)
+        if existing is not None and existing == alert:
+            interned.append(existing)
+        else:
+            _ALERT_INTERN[key] = alert
+            interned.append(alert)
+    return interned
+
+
 class ResonanceBridge:
     """
     Bridge to Resonance.ai Scanner v13 HTTP API
@@ -46,13 +73,24 @@ class ResonanceBridge:
         self.base_url = f"{settings.RESONANCE_HOST}:{settings.RESONANCE_PORT}"
         self.api_key = settings.RESONANCE_API_KEY
         self.schema_version = settings.RESONANCE_SCHEMA_VERSION
-        self.session: Optional[aiohttp.ClientSession] = None
-        self._cache: Dict[str, List[ResonanceAlert]] = {}
+        self.session: Optional[httpx.AsyncClient] = None
+        # LRU of cache_key -> (expires_at, alerts), bounded to _cache_maxsize entries
+        self._cache: "OrderedDict[str, Tuple[float, List[ResonanceAlert]]]" = OrderedDict()
         self._cache_ttl = 60  # seconds
+        self._cache_maxsize = 512
+        self._inflight: Dict[str, asyncio.Task] = {}
 
     async def connect(self):
-        """Initialize HTTP session"""
-        self.session = aiohttp.ClientSession(
+        """
+        Initialize HTTP client with a bounded keep-alive connection pool
+
+        HTTP/2 lets concurrent alert fetches share one connection when the
+        scanner is served over TLS.
+        """
+        self.session = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+            timeout=10,
             headers={
                 "X-API-Key": self.api_key or "",
                 "X-Schema-Version": self.schema_version
@@ -60,23 +98,25 @@ class ResonanceBridge:
         )
 
     async def disconnect(self):
-        """Close HTTP session"""
+        """Close HTTP client"""
         if self.session:
-            await self.session.close()
+            await self.session.aclose()
 
     async def health_check(self) -> str:
         """
         Check if Resonance service is reachable
 
+        Uses HEAD so only the status line and headers are transferred.
+
         Returns:
             "healthy" or error message
         """
         try:
-            async with self.session.get(f"{self.base_url}/health", timeout=5) as response:
-                if response.status == 200:
-                    return "healthy"
-                return f"unhealthy (status {response.status})"
-        except aiohttp.ClientError as e:
+            response = await self.session.head(f"{self.base_url}/health", timeout=5)
+            if response.status_code == 200:
+                return "healthy"
+            return f"unhealthy (status {response.status_code})"
+        except httpx.HTTPError as e:
             return f"unreachable: {str(e)}"
         except Exception as e:
             return f"error: {str(e)}"
@@ -102,46 +142,69 @@ class ResonanceBridge:
 
         Raises:
             ValidationError: If response schema doesn't match expected v13 format
-            aiohttp.ClientError: If service is unreachable
+            httpx.HTTPError: If service is unreachable
         """
 
         # Check cache
         cache_key = f"{symbol}:{timeframe}:{since}:{limit}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
-        if not self.session:
-            raise RuntimeError("Bridge not connected. Call connect() first.")
-
-        params = {"limit": limit}
-        if symbol:
-            params["symbol"] = symbol
-        if timeframe:
-            params["timeframe"] = timeframe
-        if since:
-            params["since"] = since
-
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Join an identical request that is already in flight
+        task = self._inflight.get(cache_key)
+        if task is None:
+            if not self.session:
+                raise RuntimeError("Bridge not connected. Call connect() first.")
+
+            params = {"limit": limit}
+            if symbol:
+                params["symbol"] = symbol
+            if timeframe:
+                params["timeframe"] = timeframe
+            if since:
+                params["since"] = since
+
+            # The fetch runs as its own task so cancelling one caller doesn't
+            # cancel it for everyone else waiting on the same key
+            task = asyncio.ensure_future(self._fetch_and_cache(cache_key, params))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._fetch_done(cache_key, done))
+
+        return await asyncio.shield(task)
+
+    async def _fetch_and_cache(self, cache_key: str, params: Dict[str, Any]) -> List[ResonanceAlert]:
+        """Fetch alerts and cache them under cache_key"""
+        alerts = await self._fetch_alerts(params)
+        self._cache_put(cache_key, alerts)
+        return alerts
+
+    def _fetch_done(self, cache_key: str, task: "asyncio.Task"):
+        """Forget a finished fetch, so the next miss starts a new one"""
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved in case every caller was cancelled
+
+    async def _fetch_alerts(self, params: Dict[str, Any]) -> List[ResonanceAlert]:
+        """Fetch and validate alerts from the Resonance API"""
         try:
-            async with self.session.get(
+            response = await self.session.get(
                 f"{self.base_url}/api/alerts",
                 params=params,
                 timeout=10
-            ) as response:
-                if response.status != 200:
-                    raise aiohttp.ClientError(
-                        f"Resonance API returned {response.status}"
-                    )
-
-                data = await response.json()
-
-                # Validate schema
-                alerts = [ResonanceAlert(**alert) for alert in data.get("alerts", [])]
+            )
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(
+                    f"Resonance API returned {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
 
-                # Cache results
-                self._cache[cache_key] = alerts
-                asyncio.create_task(self._expire_cache(cache_key))
+            data = response.json()
 
-                return alerts
+            # Validate schema
+            return _intern_alerts(_ALERTS_ADAPTER.validate_python(data.get("alerts", [])))
 
         except ValidationError as e:
             # Schema mismatch - critical error
@@ -161,18 +224,32 @@ class ResonanceBridge:
         if not self.session:
             raise RuntimeError("Bridge not connected")
 
-        async with self.session.get(
+        response = await self.session.get(
             f"{self.base_url}/status",
             timeout=5
-        ) as response:
-            if response.status == 200:
-                return await response.json()
-            return {"status": "error", "code": response.status}
-
-    async def _expire_cache(self, key: str):
-        """Remove cache entry after TTL expires"""
-        await asyncio.sleep(self._cache_ttl)
-        self._cache.pop(key, None)
+        )
+        if response.status_code == 200:
+            return response.json()
+        return {"status": "error", "code": response.status_code}
+
+    def _cache_get(self, key: str) -> Optional[List[ResonanceAlert]]:
+        """Return cached alerts if present and not expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, alerts = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return alerts
+
+    def _cache_put(self, key: str, alerts: List[ResonanceAlert]):
+        """Cache alerts for the TTL, evicting least recently used entries"""
+        self._cache[key] = (time.monotonic() + self._cache_ttl, alerts)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_maxsize:
+            self._cache.popitem(last=False)
 
 
 # Dependency injection helper for FastAPI
@@ -64,7 +64,7 @@ def generate_mock_alerts(symbol: str, count: int = 5, timeframe: str = "1h") ->
     return alerts
 
 
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
     """Health check endpoint"""
     return {
@@ -5,7 +5,7 @@ Data models for virtual portfolio management and order simulation
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Any, Dict, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -64,7 +64,25 @@ class CreatePortfolioRequest(BaseModel):
     description: Optional[str] = Field(None, max_length=500)
 
 
+class BatchSubRequest(BaseModel):
+    """
+    One step of a batch request
+
+    The path is relative to the paper trading API and may reference a field
+    of an earlier step's response as {index.field}, e.g. "/portfolios/{0.id}/orders"
+    """
+    method: Literal["GET", "POST", "DELETE"] = Field(..., description="HTTP method")
+    path: str = Field(..., description="Path relative to /api/paper-trading")
+    body: Optional[Dict[str, Any]] = Field(None, alias="json", description="JSON request body")
+
+
 # Response Models
+class BatchSubResponse(BaseModel):
+    """Result of one batch step"""
+    status_code: int
+    body: Any = None
+
+
 class Order(BaseModel):
     """Paper trading order"""
     id: str
@@ -83,6 +101,11 @@ class Order(BaseModel):
     cancelled_at: Optional[datetime]
 
 
+class CreateOrderResponse(Order):
+    """Newly created order with the portfolio's cash balance after any fill"""
+    portfolio_balance_after: float
+
+
 class Position(BaseModel):
     """Active trading position"""
     id: str
@@ -204,8 +227,6 @@ class TradeData(BaseModel):
     quantity: float
     price: float
     fee: float
+    total: float  # quantity * price + fee, stored at execution time
     executed_at: datetime
-
-    @property
-    def total(self) -> float:
-        return (self.quantity * self.price) + self.fee
+    executed_at_ns: int = 0  # Monotonic clock, for cheap ordering comparisons
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+from types import CodeType
 from typing import Any, Dict, List, Optional
 import builtins as _builtins
 
@@ -14,6 +16,7 @@ class Order:
     direction: str  # 'long' or 'short'
     qty: float
     price: Optional[float] = None
+    bar: Optional[int] = None  # Index of the bar the order was placed on
 
 
 class Strategy:
@@ -21,9 +24,10 @@ class Strategy:
         self.df = df
         self.orders: List[Order] = []
         self.positions: Dict[str, float] = {}
+        self.bar_index: Optional[int] = None
 
-    def entry(self, id: str, direction: str, qty: float, price: Optional[float] = None):
-        self.orders.append(Order(id=id, direction=direction, qty=float(qty), price=price))
+    def entry(self, id: str, direction: str, qty: float = 1.0, price: Optional[float] = None):
+        self.orders.append(Order(id=id, direction=direction, qty=float(qty), price=price, bar=self.bar_index))
         self.positions[id] = self.positions.get(id, 0.0) + (qty if direction == 'long' else -qty)
 
     def exit(self, id: str, from_entry: Optional[str] = None, qty: Optional[float] = None, price: Optional[float] = None):
@@ -35,7 +39,7 @@ class Strategy:
         if qty is None:
             qty = abs(pos)
         direction = 'short' if pos > 0 else 'long'
-        self.orders.append(Order(id=id, direction=direction, qty=float(qty), price=price))
+        self.orders.append(Order(id=id, direction=direction, qty=float(qty), price=price, bar=self.bar_index))
         new_pos = pos - (qty if pos > 0 else -qty)
         self.positions[key] = new_pos
 
@@ -44,7 +48,7 @@ class Strategy:
         if pos == 0:
             return
         direction = 'short' if pos > 0 else 'long'
-        self.orders.append(Order(id=id, direction=direction, qty=abs(pos)))
+        self.orders.append(Order(id=id, direction=direction, qty=abs(pos), bar=self.bar_index))
         self.positions[id] = 0.0
 
     def position_size(self) -> float:
@@ -54,48 +58,76 @@ class Strategy:
         return float(total)
 
 
+def crossover(a, b) -> np.ndarray:
+    """True on bars where a moves from below b to at or above it"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.broadcast_to(np.asarray(b, dtype=np.float64), a.shape)
+    out = np.zeros(a.shape, dtype=bool)
+    np.logical_and(a[:-1] < b[:-1], a[1:] >= b[1:], out=out[1:])
+    return out
+
+
+def crossunder(a, b) -> np.ndarray:
+    """True on bars where a moves from above b to at or below it"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.broadcast_to(np.asarray(b, dtype=np.float64), a.shape)
+    out = np.zeros(a.shape, dtype=bool)
+    np.logical_and(a[:-1] > b[:-1], a[1:] <= b[1:], out=out[1:])
+    return out
+
+
+_orig_import = _builtins.__import__
+_ALLOWED_IMPORT_ROOTS = frozenset({'numpy', 'pandas', 'talib', 'pine2py'})
+
+
+def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):  # type: ignore
+    """Restricted importer that allows only a small whitelist"""
+    root = name.split('.')[0]
+    if root not in _ALLOWED_IMPORT_ROOTS:
+        raise ImportError("__import__ not found")
+    return _orig_import(name, globals, locals, fromlist, level)
+
+
+_SAFE_BUILTINS: Dict[str, Any] = {
+    'len': len,
+    'range': range,
+    'enumerate': enumerate,
+    'min': min,
+    'max': max,
+    'float': float,
+    'int': int,
+    'bool': bool,
+    'str': str,
+    'print': print,
+    '__import__': _safe_import,
+    '__build_class__': _builtins.__build_class__,
+    'object': object,
+    'type': type,
+    'isinstance': isinstance,
+    'super': _builtins.super,
+    'property': _builtins.property,
+    'staticmethod': _builtins.staticmethod,
+    'classmethod': _builtins.classmethod,
+}
+
+
+@lru_cache(maxsize=128)
+def _compile_translated(code_str: str) -> CodeType:
+    """Compile translated source once; rerunning the same script reuses the code object"""
+    return compile(code_str, '<pine2py>', 'exec')
+
+
 def execute_translated_code(code_str: str, df: pd.DataFrame) -> Dict[str, Any]:
-    # Prepare a sandboxed execution environment
-    # Restricted importer that allows only a small whitelist
-    _orig_import = _builtins.__import__
-
-    def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):  # type: ignore
-        allowed_roots = {
-            'numpy', 'pandas', 'talib', 'pine2py'
-        }
-        root = name.split('.')[0]
-        if root not in allowed_roots:
-            raise ImportError("__import__ not found")
-        return _orig_import(name, globals, locals, fromlist, level)
-
-    safe_builtins: Dict[str, Any] = {
-        'len': len,
-        'range': range,
-        'enumerate': enumerate,
-        'min': min,
-        'max': max,
-        'float': float,
-        'int': int,
-        'bool': bool,
-        'str': str,
-        'print': print,
-        '__import__': _safe_import,
-        '__build_class__': _builtins.__build_class__,
-        'object': object,
-        'type': type,
-        'isinstance': isinstance,
-        'super': _builtins.super,
-        'property': _builtins.property,
-        'staticmethod': _builtins.staticmethod,
-        'classmethod': _builtins.classmethod,
-    }
-    exec_globals: Dict[str, Any] = {'__builtins__': safe_builtins, '__name__': 'pine2py_exec'}
+    # Prepare a sandboxed execution environment; the builtins are copied so
+    # a script can't alter them for later runs
+    exec_globals: Dict[str, Any] = {'__builtins__': dict(_SAFE_BUILTINS), '__name__': 'pine2py_exec'}
     exec_locals: Dict[str, Any] = {}
     # Provide Strategy and dependencies
     try:
         import talib
     except ImportError:
-        talib = None
+        # NumPy/pandas versions of the TA-Lib functions translated code calls
+        from . import indicators as talib
 
     from .plotting import plot
 
@@ -105,9 +137,11 @@ def execute_translated_code(code_str: str, df: pd.DataFrame) -> Dict[str, Any]:
         'talib': talib,
         'Strategy': Strategy,
         'plot': plot,
+        'crossover': crossover,
+        'crossunder': crossunder,
     })
     # Execute code to define the TranslatedStrategy class
-    exec(code_str, exec_globals, exec_locals)
+    exec(_compile_translated(code_str), exec_globals, exec_locals)
     # Class may land in globals or locals depending on exec
     StrategyClass = exec_locals.get('TranslatedStrategy') or exec_globals.get('TranslatedStrategy')
     if StrategyClass is None:
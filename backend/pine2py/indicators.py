@@ -0,0 +1,117 @@
+"""
+NumPy/pandas stand-ins for the TA-Lib functions used by translated strategies
+
+Used by the executor when the TA-Lib C library isn't installed. Each function
+takes and returns float64 arrays with TA-Lib's signature and NaN warm-up.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _as_float_array(real) -> np.ndarray:
+    return np.asarray(real, dtype=np.float64)
+
+
+def _smooth(x: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = x[0], then y[i] = alpha * x[i] + (1 - alpha) * y[i - 1]"""
+    out = np.empty_like(x)
+    out[0] = x[0]
+    for i in range(1, len(x)):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+if njit is not None:
+    _smooth = njit(cache=True)(_smooth)
+else:
+    def _smooth(x: np.ndarray, alpha: float) -> np.ndarray:
+        return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _seeded_ewm(x: np.ndarray, timeperiod: int, alpha: float) -> np.ndarray:
+    """
+    Exponential smoothing seeded with the mean of the first timeperiod values
+
+    Output is NaN for the first timeperiod - 1 entries, like TA-Lib.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) < timeperiod:
+        return out
+    seeded = x[timeperiod - 1:].copy()
+    seeded[0] = x[:timeperiod].mean()
+    out[timeperiod - 1:] = _smooth(seeded, alpha)
+    return out
+
+
+def SMA(real, timeperiod: int = 30) -> np.ndarray:
+    """
+    Simple moving average
+
+    Window sums come from one cumulative sum, so a NaN input stays NaN in
+    every later output, as with TA-Lib's running sum.
+    """
+    x = _as_float_array(real)
+    out = np.full(len(x), np.nan)
+    if len(x) < timeperiod:
+        return out
+    csum = np.cumsum(x)
+    out[timeperiod - 1] = csum[timeperiod - 1]
+    out[timeperiod:] = csum[timeperiod:] - csum[:-timeperiod]
+    out[timeperiod - 1:] /= timeperiod
+    return out
+
+
+def EMA(real, timeperiod: int = 30) -> np.ndarray:
+    """Exponential moving average, seeded with the SMA of the first window"""
+    return _seeded_ewm(_as_float_array(real), timeperiod, 2.0 / (timeperiod + 1))
+
+
+def RSI(real, timeperiod: int = 14) -> np.ndarray:
+    """Relative strength index with Wilder smoothing"""
+    x = _as_float_array(real)
+    out = np.full(len(x), np.nan)
+    if len(x) <= timeperiod:
+        return out
+
+    change = np.diff(x)
+    avg_gain = _seeded_ewm(np.clip(change, 0, None), timeperiod, 1.0 / timeperiod)
+    avg_loss = _seeded_ewm(np.clip(-change, 0, None), timeperiod, 1.0 / timeperiod)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 * avg_gain / (avg_gain + avg_loss)
+    # Flat prices have no gains or losses; TA-Lib reports 0
+    rsi[(avg_gain + avg_loss) == 0] = 0.0
+    out[1:] = rsi
+    return out
+
+
+def MACD(
+    real,
+    fastperiod: int = 12,
+    slowperiod: int = 26,
+    signalperiod: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Moving average convergence/divergence
+
+    Returns:
+        (macd, signal, hist), all NaN until the signal line is available
+    """
+    x = _as_float_array(real)
+    macd = EMA(x, fastperiod) - EMA(x, slowperiod)
+
+    signal = np.full(len(x), np.nan)
+    start = max(fastperiod, slowperiod) - 1
+    if len(x) > start:
+        signal[start:] = EMA(macd[start:], signalperiod)
+
+    macd[np.isnan(signal)] = np.nan
+    return macd, signal, macd - signal
@@ -1,4 +1,7 @@
-import matplotlib.pyplot as plt
+try:
+    import matplotlib.pyplot as plt
+except ImportError:  # Optional; plot() then falls back to the console
+    plt = None
 
 
 def plot(series, label: str = None):
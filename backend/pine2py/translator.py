@@ -1,14 +1,15 @@
 import re
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 
 from .parser import parse
 from .mapper import replace_builtins, replace_math, replace_logicals, parse_input_call, normalize_literal
 
 
-def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
-    code: List[str] = []
+def _translate_line(line: str, pine_lineno: Optional[int] = None) -> List[str]:
+    # The source line number goes on its own comment line above the statement
+    code: List[str] = [f"# pine_line:{pine_lineno}"] if pine_lineno is not None else []
     s = line.strip()
-    prefix = f"# pine_line:{pine_lineno} " if pine_lineno is not None else ""
 
     # Inputs: x = input.int(14)
     assign_m = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(input\.(?:int|float|bool|string))\s*\((.*)\)\s*$", s)
@@ -21,7 +22,7 @@ def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
         if parsed:
             _, default = parsed
         default = normalize_literal(default) or "None"
-        code.append(f"{prefix}{var} = {default}")
+        code.append(f"{var} = {default}")
         return code
 
     # strategy.entry/exit/close
@@ -29,29 +30,29 @@ def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
         # strategy.entry(id, direction, qty)
         m = re.match(r"strategy\.entry\s*\((.*)\)\s*", s)
         if m:
-            args = m.group(1)
-            code.append(f"{prefix}self.entry({args})")
+            args = replace_logicals(replace_math(replace_builtins(m.group(1))))
+            code.append(f"self.entry({args})")
             return code
 
     if s.startswith("strategy.exit"):
         m = re.match(r"strategy\.exit\s*\((.*)\)\s*", s)
         if m:
-            args = m.group(1)
-            code.append(f"{prefix}self.exit({args})")
+            args = replace_logicals(replace_math(replace_builtins(m.group(1))))
+            code.append(f"self.exit({args})")
             return code
 
     if s.startswith("strategy.close"):
         m = re.match(r"strategy\.close\s*\((.*)\)\s*", s)
         if m:
-            args = m.group(1)
-            code.append(f"{prefix}self.close({args})")
+            args = replace_logicals(replace_math(replace_builtins(m.group(1))))
+            code.append(f"self.close({args})")
             return code
 
     # plot(x)
     if s.startswith("plot("):
         inner = s[s.find("(") + 1 : s.rfind(")")]
         expr = replace_logicals(replace_math(replace_builtins(inner)))
-        code.append(f"{prefix}plot({expr})")
+        code.append(f"plot({expr})")
         return code
 
     # Assignments including ta.*
@@ -68,12 +69,11 @@ def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
             a1 = replace_builtins(args[0])
             a2 = replace_builtins(args[1]) if len(args) > 1 else None
             if a2 is None:
-                code.append(f"{prefix}{var} = np.zeros(len(df), dtype=bool)")
+                code.append(f"{var} = np.zeros(len(df), dtype=bool)")
             else:
-                if func == 'crossover':
-                    code.append(f"{prefix}{var} = (({a1}).shift(1) < ({a2}).shift(1)) & (({a1}) >= ({a2}))")
-                else:
-                    code.append(f"{prefix}{var} = (({a1}).shift(1) > ({a2}).shift(1)) & (({a1}) <= ({a2}))")
+                # talib returns ndarrays, so compare with the executor's
+                # NumPy helpers rather than Series.shift
+                code.append(f"{var} = {func}({a1}, {a2})")
             return code
 
         # ta.macd special: returns 3 series
@@ -86,7 +86,7 @@ def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
                 slow = args[2] if len(args) > 2 else "26"
                 signal = args[3] if len(args) > 3 else "9"
                 code.append(
-                    f"{prefix}{var}_macd, {var}_signal, {var}_hist = talib.MACD(({source}).values, fastperiod=int({fast}), slowperiod=int({slow}), signalperiod=int({signal}))"
+                    f"{var}_macd, {var}_signal, {var}_hist = talib.MACD(({source}).values, fastperiod=int({fast}), slowperiod=int({slow}), signalperiod=int({signal}))"
                 )
                 return code
 
@@ -98,45 +98,84 @@ def _translate_line(line: str, pine_lineno: int | None = None) -> List[str]:
             source = replace_builtins(args[0])
             length = args[1] if len(args) > 1 else "14"
             if func == "rsi":
-                code.append(f"{prefix}{var} = talib.RSI(({source}).values, timeperiod=int({length}))")
+                code.append(f"{var} = talib.RSI(({source}).values, timeperiod=int({length}))")
             elif func == "sma":
-                code.append(f"{prefix}{var} = talib.SMA(({source}).values, timeperiod=int({length}))")
+                code.append(f"{var} = talib.SMA(({source}).values, timeperiod=int({length}))")
             elif func == "ema":
-                code.append(f"{prefix}{var} = talib.EMA(({source}).values, timeperiod=int({length}))")
+                code.append(f"{var} = talib.EMA(({source}).values, timeperiod=int({length}))")
             return code
 
         # generic expression mapping
         expr = replace_logicals(replace_math(replace_builtins(expr)))
-        code.append(f"{prefix}{var} = {expr}")
-        return code
-
-    # if/else basic pass-through
-    if s.startswith("if ") or s == "else" or s.startswith("else "):
-        stmt = replace_logicals(replace_math(replace_builtins(s)))
-        if stmt.startswith("if ") and not stmt.rstrip().endswith(":"):
-            stmt = stmt + ":"
-        if stmt.startswith("else") and not stmt.rstrip().endswith(":"):
-            stmt = stmt + ":"
-        code.append(prefix + stmt)
+        code.append(f"{var} = {expr}")
         return code
 
     # fallback: expression statement
-    code.append(prefix + replace_logicals(replace_math(replace_builtins(s))))
+    code.append(replace_logicals(replace_math(replace_builtins(s))))
     return code
 
 
+def _indent_level(line: str) -> int:
+    """Pine block depth of a raw line (4 spaces or one tab per level)"""
+    indent = line[:len(line) - len(line.lstrip())].expandtabs(4)
+    return len(indent) // 4
+
+
+def _is_bar_statement(s: str) -> bool:
+    """Statements that act per bar rather than define whole series"""
+    return s.startswith(("if ", "else", "strategy."))
+
+
+@lru_cache(maxsize=128)
 def translate(pine_code: str) -> str:
+    """
+    Translate a Pine Script strategy into a TranslatedStrategy class
+
+    Top-level assignments become whole-series NumPy/talib expressions that run
+    once. if/else blocks and strategy.* calls run inside a loop over bars;
+    conditions that don't depend on strategy state are evaluated up front as
+    boolean arrays and indexed per bar.
+    """
+    # Cached because the editor sends the same script to /validate, /translate and /execute
     ast = parse(pine_code)
-    run_lines: List[str] = []
+    series_lines: List[str] = []
+    condition_lines: List[str] = []
+    bar_lines: List[str] = []
     for pl in ast.body:
-        for py in _translate_line(pl.raw, pl.lineno):
-            run_lines.append(py)
+        s = pl.raw.strip()
+        level = _indent_level(pl.raw)
+        if level == 0 and not _is_bar_statement(s):
+            series_lines.extend(_translate_line(pl.raw, pl.lineno))
+            continue
+
+        indent = "    " * (level + 1)
+        m_if = re.match(r"^(else\s+)?if\s+(.*?):?\s*$", s)
+        if m_if:
+            cond = replace_logicals(replace_math(replace_builtins(m_if.group(2))))
+            cond = re.sub(r"(?<![\w\.])ta\.(crossover|crossunder)\s*\(", r"\1(", cond)
+            if "self." not in cond:
+                name = f"_cond_{len(condition_lines)}"
+                condition_lines.append(f"{name} = np.broadcast_to(np.asarray({cond}, dtype=bool), (len(df),))")
+                cond = f"{name}[i]"
+            keyword = "elif" if m_if.group(1) else "if"
+            stmts = [f"# pine_line:{pl.lineno}", f"{keyword} {cond}:"]
+        elif re.match(r"^else\s*:?\s*$", s):
+            stmts = [f"# pine_line:{pl.lineno}", "else:"]
+        else:
+            stmts = _translate_line(pl.raw, pl.lineno)
+        bar_lines.extend(indent + stmt for stmt in stmts)
+
+    run_lines = series_lines + condition_lines
+    if bar_lines:
+        run_lines.append("for i in range(len(df)):")
+        run_lines.append("    self.bar_index = i")
+        run_lines.extend(bar_lines)
 
     body = "\n        ".join(run_lines) if run_lines else "pass"
 
     class_name = "TranslatedStrategy"
     code = f"""
-# Dependencies (np, pd, talib, Strategy, plot) are provided by executor
+# Dependencies (np, pd, talib, Strategy, plot, crossover, crossunder) are provided by executor
 
 class {class_name}(Strategy):
     def __init__(self, df: pd.DataFrame):
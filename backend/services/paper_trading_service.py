@@ -6,17 +6,133 @@ Handles order execution, position management, and portfolio tracking
 
 from typing import Dict, List, Optional
 from datetime import datetime
+import itertools
+import time
 import uuid
 from collections import defaultdict
 
+import numpy as np
+
 from ..models.paper_trading import (
     PortfolioData, OrderData, PositionData, TradeData,
     Portfolio, PortfolioSummary, Order, Position, Trade, PortfolioStats,
-    CreateOrderRequest, CreatePortfolioRequest,
+    CreateOrderRequest, CreateOrderResponse, CreatePortfolioRequest,
     OrderSide, OrderType, OrderStatus, PositionSide
 )
 
 
+# Stand-in market price until portfolio valuation uses live market data
+PLACEHOLDER_PRICE = 50000.0
+
+
+class _PlaceholderPrices(dict):
+    """
+    Price lookup that answers PLACEHOLDER_PRICE for every symbol
+
+    Every symbol resolves, so get() never falls back to a default. It still
+    takes one positionally, as list_positions passes one for real price dicts.
+    """
+
+    def __missing__(self, symbol: str) -> float:
+        return PLACEHOLDER_PRICE
+
+    def get(self, symbol: str, *_) -> float:
+        return PLACEHOLDER_PRICE
+
+
+# Trade response fields (TradeData also carries internal-only fields)
+_TRADE_FIELDS = tuple(Trade.model_fields)
+
+
+class _PendingOrderBook:
+    """
+    Trigger prices of pending orders for a single symbol
+
+    Each order occupies one slot in preallocated parallel arrays that grow
+    by doubling. Side is +1 for orders that trigger when the market falls
+    to their price (limit buys, stop losses) and -1 for orders that trigger
+    when it rises to it (limit sells, take profits), so a price update is a
+    single vectorized comparison. Orders without a trigger price hold NaN
+    and never trigger. Removal swaps the last slot into the freed one.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.order_ids: List[str] = []
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.sides = np.empty(capacity, dtype=np.int8)
+        self.fill_at_price = np.empty(capacity, dtype=bool)
+        self.sequence = np.empty(capacity, dtype=np.int64)
+        self._slots: Dict[str, int] = {}
+
+    def add(self, order: OrderData, sequence: int) -> None:
+        """Track a pending order"""
+        price, side, fill_at_price = np.nan, 0, False
+
+        if order.order_type == OrderType.LIMIT and order.price:
+            price, fill_at_price = order.price, True
+            side = 1 if order.side == OrderSide.BUY else -1
+        elif order.order_type == OrderType.STOP_LOSS and order.stop_price:
+            price, side = order.stop_price, 1
+        elif order.order_type == OrderType.TAKE_PROFIT and order.stop_price:
+            price, side = order.stop_price, -1
+
+        slot = len(self.order_ids)
+        if slot == len(self.prices):
+            self._grow()
+
+        self.prices[slot] = price
+        self.sides[slot] = side
+        self.fill_at_price[slot] = fill_at_price
+        self.sequence[slot] = sequence
+        self.order_ids.append(order.id)
+        self._slots[order.id] = slot
+
+    def remove(self, order_id: str) -> None:
+        """Stop tracking an order, if it is tracked"""
+        slot = self._slots.pop(order_id, None)
+        if slot is None:
+            return
+
+        last = len(self.order_ids) - 1
+        last_id = self.order_ids.pop()
+        if slot != last:
+            self.prices[slot] = self.prices[last]
+            self.sides[slot] = self.sides[last]
+            self.fill_at_price[slot] = self.fill_at_price[last]
+            self.sequence[slot] = self.sequence[last]
+            self.order_ids[slot] = last_id
+            self._slots[last_id] = slot
+
+    def triggered(self, current_price: float):
+        """
+        Find orders whose trigger condition is met at current_price
+
+        Returns:
+            (slot indices, execution prices) of triggered orders
+        """
+        n = len(self.order_ids)
+        prices = self.prices[:n]
+
+        indices = np.flatnonzero((prices - current_price) * self.sides[:n] >= 0)
+
+        # Limit orders fill at their limit price, stop orders at market
+        execution_prices = np.where(self.fill_at_price[indices], prices[indices], current_price)
+
+        return indices, execution_prices
+
+    def _grow(self) -> None:
+        """Double the capacity of the slot arrays"""
+        capacity = 2 * len(self.prices)
+        for name in ("prices", "sides", "fill_at_price", "sequence"):
+            values = getattr(self, name)
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:len(values)] = values
+            setattr(self, name, grown)
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+
 class PaperTradingService:
     """
     In-memory paper trading system
@@ -36,9 +152,16 @@ class PaperTradingService:
         self.portfolio_positions: Dict[str, List[str]] = defaultdict(list)
         self.portfolio_trades: Dict[str, List[str]] = defaultdict(list)
 
+        # Pending limit/stop orders by symbol, checked on price updates
+        self.pending_books: Dict[str, _PendingOrderBook] = defaultdict(_PendingOrderBook)
+        self._order_sequence = itertools.count()
+
         # Fee configuration (0.1% per trade)
         self.fee_rate = 0.001
 
+        # Shared across portfolio responses instead of a dict per call
+        self._placeholder_prices = _PlaceholderPrices()
+
     # Portfolio Management
 
     def create_portfolio(self, request: CreatePortfolioRequest) -> Portfolio:
@@ -90,7 +213,9 @@ class PaperTradingService:
 
         # Delete all associated orders, positions, trades
         for order_id in self.portfolio_orders[portfolio_id]:
-            del self.orders[order_id]
+            order = self.orders.pop(order_id)
+            if order.status == OrderStatus.PENDING:
+                self.pending_books[order.symbol].remove(order_id)
 
         for position_id in self.portfolio_positions[portfolio_id]:
             del self.positions[position_id]
@@ -105,6 +230,7 @@ class PaperTradingService:
 
         # Delete portfolio
         del self.portfolios[portfolio_id]
+
         return True
 
     # Order Management
@@ -114,7 +240,7 @@ class PaperTradingService:
         portfolio_id: str,
         request: CreateOrderRequest,
         current_price: float
-    ) -> Order:
+    ) -> CreateOrderResponse:
         """
         Create and potentially execute an order
 
@@ -124,7 +250,7 @@ class PaperTradingService:
             current_price: Current market price for the symbol
 
         Returns:
-            Created order
+            Created order, with the portfolio's cash balance after execution
         """
         if portfolio_id not in self.portfolios:
             raise ValueError(f"Portfolio {portfolio_id} not found")
@@ -157,7 +283,13 @@ class PaperTradingService:
                (request.side == OrderSide.SELL and current_price >= request.price):
                 self._execute_order(order_id, request.price)
 
-        return self._build_order_response(order_id)
+        if order_data.status == OrderStatus.PENDING:
+            self.pending_books[request.symbol].add(order_data, next(self._order_sequence))
+
+        return CreateOrderResponse.model_construct(
+            **order_data.__dict__,
+            portfolio_balance_after=self.portfolios[portfolio_id].cash_balance
+        )
 
     def get_order(self, order_id: str) -> Optional[Order]:
         """Get order by ID"""
@@ -190,6 +322,7 @@ class PaperTradingService:
 
         order.status = OrderStatus.CANCELLED
         order.cancelled_at = datetime.utcnow()
+        self.pending_books[order.symbol].remove(order_id)
 
         return self._build_order_response(order_id)
 
@@ -219,13 +352,13 @@ class PaperTradingService:
     def list_trades(self, portfolio_id: str, limit: int = 100) -> List[Trade]:
         """List trade history for a portfolio"""
         trade_ids = self.portfolio_trades.get(portfolio_id, [])
-        trades = []
+        if limit <= 0:
+            return []
 
-        for trade_id in trade_ids:
-            if trade_id in self.trades:
-                trades.append(self._build_trade_response(trade_id))
+        # Trade IDs are appended at execution, so the tail is the most recent
+        recent_ids = trade_ids[-limit:][::-1]
 
-        return sorted(trades, key=lambda x: x.executed_at, reverse=True)[:limit]
+        return [self._build_trade_response(trade_id) for trade_id in recent_ids if trade_id in self.trades]
 
     # Price Updates (for limit/stop orders)
 
@@ -239,54 +372,50 @@ class PaperTradingService:
         Returns:
             List of orders that were executed
         """
-        executed_orders = []
+        triggered_ids: List[str] = []
+        triggered_prices: List[float] = []
+        triggered_sequence: List[int] = []
 
-        for order_id, order in self.orders.items():
-            if order.status != OrderStatus.PENDING:
+        for symbol, current_price in prices.items():
+            book = self.pending_books.get(symbol)
+            if not book:
                 continue
 
-            current_price = prices.get(order.symbol)
-            if current_price is None:
-                continue
-
-            should_execute = False
-            execution_price = current_price
-
-            # Check limit orders
-            if order.order_type == OrderType.LIMIT and order.price:
-                if (order.side == OrderSide.BUY and current_price <= order.price) or \
-                   (order.side == OrderSide.SELL and current_price >= order.price):
-                    should_execute = True
-                    execution_price = order.price
+            indices, execution_prices = book.triggered(current_price)
+            for index, execution_price in zip(indices.tolist(), execution_prices.tolist()):
+                triggered_ids.append(book.order_ids[index])
+                triggered_prices.append(execution_price)
+                triggered_sequence.append(int(book.sequence[index]))
 
-            # Check stop loss orders
-            elif order.order_type == OrderType.STOP_LOSS and order.stop_price:
-                if current_price <= order.stop_price:
-                    should_execute = True
-                    execution_price = current_price
-
-            # Check take profit orders
-            elif order.order_type == OrderType.TAKE_PROFIT and order.stop_price:
-                if current_price >= order.stop_price:
-                    should_execute = True
-                    execution_price = current_price
+        # Execute in order arrival sequence, as cash checks depend on it
+        executed_orders = []
+        for i in np.argsort(triggered_sequence, kind="stable").tolist():
+            order_id = triggered_ids[i]
+            if not self._is_pending(order_id):
+                continue  # Cancelled or deleted since it was queued
 
-            if should_execute:
-                self._execute_order(order_id, execution_price)
-                executed_orders.append(self._build_order_response(order_id))
+            self._execute_order(order_id, triggered_prices[i])
+            self.pending_books[self.orders[order_id].symbol].remove(order_id)
+            executed_orders.append(self._build_order_response(order_id))
 
         return executed_orders
 
     # Internal Helper Methods
 
+    def _is_pending(self, order_id: str) -> bool:
+        """Check whether an order still exists and awaits execution"""
+        order = self.orders.get(order_id)
+        return order is not None and order.status == OrderStatus.PENDING
+
     def _execute_order(self, order_id: str, execution_price: float) -> None:
         """Execute an order at the given price"""
         order = self.orders[order_id]
         portfolio = self.portfolios[order.portfolio_id]
 
         # Calculate fee
-        fee = execution_price * order.quantity * self.fee_rate
-        total_cost = (execution_price * order.quantity) + fee
+        notional = execution_price * order.quantity
+        fee = notional * self.fee_rate
+        total_cost = notional + fee
 
         # Check if portfolio has sufficient balance
         if order.side == OrderSide.BUY:
@@ -303,7 +432,7 @@ class PaperTradingService:
                 symbol=order.symbol,
                 side=PositionSide.LONG,
                 quantity=order.quantity,
-                cost=execution_price * order.quantity
+                cost=notional
             )
 
         else:  # SELL
@@ -314,8 +443,7 @@ class PaperTradingService:
                 return
 
             # Add to cash balance
-            revenue = (execution_price * order.quantity) - fee
-            portfolio.cash_balance += revenue
+            portfolio.cash_balance += notional - fee
 
             # Update position
             self._reduce_position(
@@ -341,7 +469,9 @@ class PaperTradingService:
             quantity=order.quantity,
             price=execution_price,
             fee=fee,
-            executed_at=datetime.utcnow()
+            total=total_cost,
+            executed_at=datetime.utcnow(),
+            executed_at_ns=time.monotonic_ns()
         )
 
         self.trades[trade_id] = trade_data
@@ -401,7 +531,11 @@ class PaperTradingService:
         """Calculate portfolio statistics"""
         portfolio = self.portfolios[portfolio_id]
         positions = self.list_positions(portfolio_id, current_prices)
-        trades = self.list_trades(portfolio_id)
+        trades = [
+            self.trades[trade_id]
+            for trade_id in self.portfolio_trades.get(portfolio_id, [])
+            if trade_id in self.trades
+        ]
 
         # Calculate positions value
         positions_value = sum(p.quantity * p.current_price for p in positions)
@@ -422,7 +556,7 @@ class PaperTradingService:
         sells = [t for t in trades if t.side == OrderSide.SELL]
 
         for sell in sells:
-            matching_buys = [b for b in buys if b.symbol == sell.symbol and b.executed_at < sell.executed_at]
+            matching_buys = [b for b in buys if b.symbol == sell.symbol and b.executed_at_ns < sell.executed_at_ns]
             if matching_buys:
                 avg_buy_price = sum(b.price for b in matching_buys) / len(matching_buys)
                 if sell.price > avg_buy_price:
@@ -452,14 +586,8 @@ class PaperTradingService:
         """Build portfolio response with stats"""
         portfolio = self.portfolios[portfolio_id]
 
-        # Get current prices for all positions
-        position_symbols = set()
-        for position_id in self.portfolio_positions.get(portfolio_id, []):
-            if position_id in self.positions:
-                position_symbols.add(self.positions[position_id].symbol)
-
         # For now, use placeholder prices (in real implementation, fetch from market data)
-        current_prices = {symbol: 50000.0 for symbol in position_symbols}  # Placeholder
+        current_prices = self._placeholder_prices
 
         stats = self._calculate_portfolio_stats(portfolio_id, current_prices)
 
@@ -476,8 +604,8 @@ class PaperTradingService:
 
     def _build_order_response(self, order_id: str) -> Order:
         """Build order response"""
-        order = self.orders[order_id]
-        return Order(**order.model_dump())
+        # Internal data is already validated, so skip re-validation
+        return Order.model_construct(**self.orders[order_id].__dict__)
 
     def _build_position_response(self, position_id: str, current_price: float) -> Position:
         """Build position response"""
@@ -486,7 +614,7 @@ class PaperTradingService:
         unrealized_pnl = (current_price - position.average_entry_price) * position.quantity
         unrealized_pnl_percent = (unrealized_pnl / position.total_cost) * 100 if position.total_cost > 0 else 0
 
-        return Position(
+        return Position.model_construct(
             id=position.id,
             portfolio_id=position.portfolio_id,
             symbol=position.symbol,
@@ -502,18 +630,7 @@ class PaperTradingService:
     def _build_trade_response(self, trade_id: str) -> Trade:
         """Build trade response"""
         trade = self.trades[trade_id]
-        return Trade(
-            id=trade.id,
-            portfolio_id=trade.portfolio_id,
-            order_id=trade.order_id,
-            symbol=trade.symbol,
-            side=trade.side,
-            quantity=trade.quantity,
-            price=trade.price,
-            fee=trade.fee,
-            total=trade.total,
-            executed_at=trade.executed_at
-        )
+        return Trade.model_construct(**{name: getattr(trade, name) for name in _TRADE_FIELDS})
 
     def _generate_id(self) -> str:
         """Generate unique ID"""
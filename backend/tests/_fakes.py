@@ -0,0 +1,27 @@
+"""
+Lightweight stand-ins for aiohttp objects used in tests
+"""
+
+from typing import Any
+
+
+class _FakeResp:
+    """
+    Minimal aiohttp response usable as ``session.get(...)``'s return value
+
+    Supports ``async with`` and ``await resp.json()`` without the
+    attribute dispatch of AsyncMock.
+    """
+
+    def __init__(self, status: int = 200, payload: Any = None):
+        self.status = status
+        self._payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def json(self, **kwargs):
+        return self._payload
@@ -0,0 +1,51 @@
+"""
+Pine Script fixtures shared by the pine2py tests
+
+Mirrors the SMA crossover walkthrough in test_pinescript_integration.py
+"""
+
+import numpy as np
+import pandas as pd
+
+
+SMA_CROSSOVER = """
+//@version=5
+strategy(title="SMA Crossover Test", overlay=true)
+
+fast = input.int(9, title="Fast SMA")
+slow = input.int(21, title="Slow SMA")
+
+sma_fast = ta.sma(close, fast)
+sma_slow = ta.sma(close, slow)
+
+crossover_signal = ta.crossover(sma_fast, sma_slow)
+crossunder_signal = ta.crossunder(sma_fast, sma_slow)
+
+if crossover_signal
+    strategy.entry("Long", strategy.long)
+if crossunder_signal
+    strategy.close("Long")
+
+plot(sma_fast)
+plot(sma_slow)
+"""
+
+
+def create_test_data(num_candles: int = 100) -> pd.DataFrame:
+    """Hourly random-walk OHLCV candles, seeded so every run sees the same crossings"""
+    dates = pd.DatetimeIndex(np.datetime64("2024-01-01T00", "h") + np.arange(num_candles))
+
+    # Close steps, open jitter, high and low wicks in one block
+    rng = np.random.default_rng(42)
+    noise = rng.standard_normal((num_candles, 4))
+
+    close = 100 + np.cumsum(noise[:, 0] * 2)
+    wicks = np.abs(noise[:, 2:]) * 1.5
+
+    return pd.DataFrame({
+        "open": close + noise[:, 1] * 0.5,
+        "high": close + wicks[:, 0],
+        "low": close - wicks[:, 1],
+        "close": close,
+        "volume": rng.integers(1000, 10000, num_candles)
+    }, index=dates)
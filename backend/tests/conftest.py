@@ -0,0 +1,82 @@
+"""
+Shared fixtures for backend tests
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+from ..api.main import app
+from ..models.paper_trading import CreatePortfolioRequest
+from ..services import paper_trading_service
+from ..services.paper_trading_service import PaperTradingService
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Run the event loops on uvloop where it is available"""
+    return uvloop.EventLoopPolicy() if uvloop else asyncio.DefaultEventLoopPolicy()
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test in the session loop, so session-scoped async fixtures can be shared"""
+    session_loop = pytest.mark.asyncio(scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def _warmup():
+    """
+    Hit the app once before any test runs
+
+    The first request through a route builds its validators and serializers,
+    so doing it here keeps that cost out of whichever test happens to run first.
+    Only read-only routes are used, so no state leaks into the tests; /api/health
+    is avoided because it opens the on-disk database.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/")
+        await client.get("/api/paper-trading/portfolios")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def aclient():
+    """Async client calling the app in-process over ASGI, without a server thread"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def paper_trading(monkeypatch):
+    """
+    Fresh paper trading service for every test
+
+    Replaces the module singleton the endpoints get from
+    get_paper_trading_service, so portfolios, orders and trades created by
+    one test are never visible to another, whatever order they run in.
+    """
+    service = PaperTradingService()
+    monkeypatch.setattr(paper_trading_service, "_paper_trading_service", service)
+    return service
+
+
+@pytest.fixture
+def make_portfolio(paper_trading):
+    """Factory for paper trading portfolios in the current test's service, returning the new ID"""
+    def _make_portfolio(name: str = "Test Portfolio", initial_balance: float = 100000.0) -> str:
+        request = CreatePortfolioRequest(name=name, initial_balance=initial_balance)
+        return paper_trading.create_portfolio(request).id
+
+    return _make_portfolio
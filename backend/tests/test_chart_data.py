@@ -9,6 +9,7 @@ from fastapi.testclient import TestClient
 
 from ..api.main import app
 from ..models.market_data import OHLCVCandle
+from ._fakes import _FakeResp
 
 
 @pytest.fixture
@@ -154,13 +155,10 @@ async def test_coingecko_fallback():
     from ..api.chart_data import _fetch_coingecko_data
 
     with patch('aiohttp.ClientSession.get') as mock_get:
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=[
+        mock_get.return_value = _FakeResp(200, payload=[
             [1609459200000, 29000, 29500, 28800, 29200],
             [1609462800000, 29200, 29800, 29100, 29500]
         ])
-        mock_get.return_value.__aenter__.return_value = mock_response
 
         candles = await _fetch_coingecko_data("BTC/USD", "1h", 100)
 
@@ -2,25 +2,141 @@
 Tests for Paper Trading API
 """
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from ..api.main import app
+from ..models.paper_trading import (
+    Order, OrderData, Trade, TradeData,
+    CreateOrderRequest, CreatePortfolioRequest, OrderStatus
+)
+from ..api import paper_trading_endpoints
+from ..services.paper_trading_service import PaperTradingService
+
+# Request bodies serialized once and sent as raw content
+JSON_HEADERS = {"content-type": "application/json"}
+CREATE_PORTFOLIO = orjson.dumps({
+    "name": "Test Portfolio",
+    "initial_balance": 50000.0,
+    "description": "Test portfolio for unit tests"
+})
+BUY_BTC_MARKET = orjson.dumps({"symbol": "BTC/USD", "side": "buy", "order_type": "market", "quantity": 0.1})
+BUY_BTC_MARKET_HALF = orjson.dumps({"symbol": "BTC/USD", "side": "buy", "order_type": "market", "quantity": 0.5})
+BUY_BTC_MARKET_ONE = orjson.dumps({"symbol": "BTC/USD", "side": "buy", "order_type": "market", "quantity": 1.0})
+BUY_BTC_LIMIT = orjson.dumps({"symbol": "BTC/USD", "side": "buy", "order_type": "limit", "quantity": 0.5, "price": 30000.0})
+# Very low price, won't fill
+BUY_BTC_LIMIT_UNFILLABLE = orjson.dumps(
+    {"symbol": "BTC/USD", "side": "buy", "order_type": "limit", "quantity": 0.1, "price": 1000.0}
+)
+
+
+@pytest.mark.xdist_group("pt_service")
+class TestResponseModelParity:
+    """Response builders use model_construct, which requires identical field sets"""
+
+    def test_order_fields_match(self):
+        """Test OrderData and Order declare the same fields"""
+        assert set(OrderData.model_fields) == set(Order.model_fields)
+
+    def test_trade_fields_match(self):
+        """Test TradeData covers Trade, plus internal-only fields"""
+        assert set(TradeData.model_fields) - set(Trade.model_fields) == {"executed_at_ns"}
+        assert set(Trade.model_fields) <= set(TradeData.model_fields)
+
+
+@pytest.mark.xdist_group("pt_service")
+class TestMarketPriceUpdates:
+    """Test pending order triggers on price updates"""
+
+    def test_pending_orders_trigger(self):
+        """Test limit and stop orders execute once their price is crossed"""
+        service = PaperTradingService()
+        portfolio = service.create_portfolio(
+            CreatePortfolioRequest(name="Trigger Test", initial_balance=100000)
+        )
+        service.create_order(
+            portfolio.id,
+            CreateOrderRequest(symbol="BTC/USD", side="buy", order_type="market", quantity=1.0),
+            current_price=30000.0
+        )
+        limit_buy = service.create_order(
+            portfolio.id,
+            CreateOrderRequest(symbol="BTC/USD", side="buy", order_type="limit", quantity=0.5, price=25000.0),
+            current_price=30000.0
+        )
+        stop_loss = service.create_order(
+            portfolio.id,
+            CreateOrderRequest(symbol="BTC/USD", side="sell", order_type="stop_loss", quantity=0.5, stop_price=20000.0),
+            current_price=30000.0
+        )
+
+        assert service.update_market_prices({"BTC/USD": 26000.0}) == []
+
+        executed = service.update_market_prices({"BTC/USD": 19000.0})
+
+        assert [order.id for order in executed] == [limit_buy.id, stop_loss.id]
+        assert executed[0].average_fill_price == 25000.0
+        assert executed[1].average_fill_price == 19000.0
+        assert all(order.status == OrderStatus.FILLED for order in executed)
+        assert service.update_market_prices({"BTC/USD": 10000.0}) == []
+
+    def test_cancelled_orders_leave_the_book(self):
+        """Test the book grows past its capacity and drops cancelled orders"""
+        service = PaperTradingService()
+        portfolio = service.create_portfolio(
+            CreatePortfolioRequest(name="Book Test", initial_balance=1000000)
+        )
+        orders = [
+            service.create_order(
+                portfolio.id,
+                CreateOrderRequest(symbol="BTC/USD", side="buy", order_type="limit", quantity=0.1, price=price),
+                current_price=30000.0
+            )
+            for price in range(20000, 29000, 250)
+        ]
+        for order in orders[::3]:
+            service.cancel_order(order.id)
+
+        executed = service.update_market_prices({"BTC/USD": 25000.0})
+
+        expected = [order.id for i, order in enumerate(orders) if i % 3 and order.price >= 25000.0]
+        assert [order.id for order in executed] == expected
+        assert len(service.pending_books["BTC/USD"]) == len(orders) - len(orders[::3]) - len(expected)
+
+
+@pytest.mark.xdist_group("pt_service")
+class TestTradeHistory:
+    """Test trade history limits"""
+
+    @pytest.mark.parametrize("limit,expected", [(0, 0), (-1, 0), (2, 2), (10, 3)])
+    def test_list_trades_limit(self, limit, expected):
+        """Test the limit caps the most recent trades, and non-positive limits return none"""
+        service = PaperTradingService()
+        portfolio = service.create_portfolio(
+            CreatePortfolioRequest(name="History Test", initial_balance=100000)
+        )
+        orders = [
+            service.create_order(
+                portfolio.id,
+                CreateOrderRequest(symbol="BTC/USD", side="buy", order_type="market", quantity=0.1),
+                current_price=30000.0
+            )
+            for _ in range(3)
+        ]
 
-client = TestClient(app)
+        trades = service.list_trades(portfolio.id, limit)
 
+        assert [trade.order_id for trade in trades] == [order.id for order in orders[::-1]][:expected]
 
+
+@pytest.mark.xdist_group("pt_portfolios")
 class TestPaperTradingPortfolios:
     """Test portfolio management endpoints"""
 
-    def test_create_portfolio(self):
+    async def test_create_portfolio(self, aclient):
         """Test creating a new portfolio"""
-        response = client.post(
+        response = await aclient.post(
             "/api/paper-trading/portfolios",
-            json={
-                "name": "Test Portfolio",
-                "initial_balance": 50000.0,
-                "description": "Test portfolio for unit tests"
-            }
+            content=CREATE_PORTFOLIO,
+            headers=JSON_HEADERS
         )
 
         assert response.status_code == 201
@@ -31,161 +147,112 @@ class TestPaperTradingPortfolios:
         assert "id" in data
         assert "stats" in data
 
-    def test_list_portfolios(self):
+    async def test_list_portfolios(self, aclient, make_portfolio):
         """Test listing all portfolios"""
-        # Create a portfolio first
-        client.post(
-            "/api/paper-trading/portfolios",
-            json={"name": "List Test", "initial_balance": 10000}
-        )
+        portfolio_id = make_portfolio("List Test", 10000)
 
-        response = client.get("/api/paper-trading/portfolios")
+        response = await aclient.get("/api/paper-trading/portfolios")
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) > 0
+        # Each test gets its own service, so only this test's portfolio is listed
+        assert [portfolio["id"] for portfolio in data] == [portfolio_id]
 
-    def test_get_portfolio(self):
+    async def test_get_portfolio(self, aclient, make_portfolio):
         """Test getting a specific portfolio"""
-        # Create portfolio
-        create_response = client.post(
-            "/api/paper-trading/portfolios",
-            json={"name": "Get Test", "initial_balance": 10000}
-        )
-        portfolio_id = create_response.json()["id"]
+        portfolio_id = make_portfolio("Get Test", 10000)
 
         # Get portfolio
-        response = client.get(f"/api/paper-trading/portfolios/{portfolio_id}")
+        response = await aclient.get(f"/api/paper-trading/portfolios/{portfolio_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["id"] == portfolio_id
         assert data["name"] == "Get Test"
 
-    def test_get_nonexistent_portfolio(self):
+    async def test_get_nonexistent_portfolio(self, aclient):
         """Test getting a portfolio that doesn't exist"""
-        response = client.get("/api/paper-trading/portfolios/nonexistent")
+        response = await aclient.get("/api/paper-trading/portfolios/nonexistent")
         assert response.status_code == 404
 
 
+@pytest.mark.xdist_group("pt_orders")
 class TestPaperTradingOrders:
     """Test order management endpoints"""
 
     @pytest.fixture
-    def portfolio_id(self):
-        """Create a test portfolio and return its ID"""
-        response = client.post(
-            "/api/paper-trading/portfolios",
-            json={"name": "Order Test Portfolio", "initial_balance": 100000}
-        )
-        return response.json()["id"]
-
-    def test_create_market_buy_order(self, portfolio_id):
-        """Test creating a market buy order"""
-        response = client.post(
+    def portfolio_id(self, make_portfolio):
+        """Empty portfolio to place orders against"""
+        return make_portfolio("Order Test Portfolio", 100000)
+
+    @pytest.mark.parametrize("order,expected", [
+        (BUY_BTC_MARKET, {"symbol": "BTC/USD", "side": "buy", "order_type": "market", "quantity": 0.1}),
+        (BUY_BTC_LIMIT, {"order_type": "limit", "price": 30000.0}),
+    ], ids=["market_buy", "limit_buy"])
+    async def test_create_order(self, aclient, portfolio_id, order, expected):
+        """Test creating orders of each type against the shared portfolio"""
+        response = await aclient.post(
             f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "market",
-                "quantity": 0.1
-            }
+            content=order,
+            headers=JSON_HEADERS
         )
 
         assert response.status_code == 201
         data = response.json()
-        assert data["symbol"] == "BTC/USD"
-        assert data["side"] == "buy"
-        assert data["order_type"] == "market"
-        assert data["quantity"] == 0.1
+        for field, value in expected.items():
+            assert data[field] == value
         assert data["status"] in ["filled", "pending"]
 
-    def test_create_limit_order(self, portfolio_id):
-        """Test creating a limit order"""
-        response = client.post(
-            f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "limit",
-                "quantity": 0.5,
-                "price": 30000.0
-            }
-        )
-
-        assert response.status_code == 201
-        data = response.json()
-        assert data["order_type"] == "limit"
-        assert data["price"] == 30000.0
-
-    def test_list_orders(self, portfolio_id):
+    async def test_list_orders(self, aclient, portfolio_id):
         """Test listing orders for a portfolio"""
         # Create an order first
-        client.post(
+        await aclient.post(
             f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "market",
-                "quantity": 0.1
-            }
+            content=BUY_BTC_MARKET,
+            headers=JSON_HEADERS
         )
 
-        response = client.get(f"/api/paper-trading/portfolios/{portfolio_id}/orders")
+        response = await aclient.get(f"/api/paper-trading/portfolios/{portfolio_id}/orders")
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
 
-    def test_cancel_order(self, portfolio_id):
+    async def test_cancel_order(self, aclient, portfolio_id):
         """Test cancelling a pending order"""
         # Create a limit order (will be pending)
-        create_response = client.post(
+        create_response = await aclient.post(
             f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "limit",
-                "quantity": 0.1,
-                "price": 1000.0  # Very low price, won't fill
-            }
+            content=BUY_BTC_LIMIT_UNFILLABLE,
+            headers=JSON_HEADERS
         )
         order_id = create_response.json()["id"]
 
         # Cancel the order
-        response = client.delete(f"/api/paper-trading/orders/{order_id}")
+        response = await aclient.delete(f"/api/paper-trading/orders/{order_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "cancelled"
 
 
+@pytest.mark.xdist_group("pt_positions")
 class TestPaperTradingPositions:
     """Test position management endpoints"""
 
     @pytest.fixture
-    def portfolio_with_position(self):
+    def portfolio_with_position(self, paper_trading, make_portfolio):
         """Create a portfolio and open a position"""
-        # Create portfolio
-        portfolio_response = client.post(
-            "/api/paper-trading/portfolios",
-            json={"name": "Position Test", "initial_balance": 100000}
-        )
-        portfolio_id = portfolio_response.json()["id"]
+        portfolio_id = make_portfolio("Position Test", 100000)
 
         # Create buy order to open position
-        client.post(
-            f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "market",
-                "quantity": 1.0
-            }
+        paper_trading.create_order(
+            portfolio_id,
+            CreateOrderRequest.model_validate_json(BUY_BTC_MARKET_ONE),
+            current_price=30000.0
         )
 
         return portfolio_id
 
-    def test_list_positions(self, portfolio_with_position):
+    async def test_list_positions(self, aclient, portfolio_with_position):
         """Test listing positions"""
-        response = client.get(
+        response = await aclient.get(
             f"/api/paper-trading/portfolios/{portfolio_with_position}/positions"
         )
 
@@ -194,34 +261,27 @@ class TestPaperTradingPositions:
         assert isinstance(data, list)
 
 
+@pytest.mark.xdist_group("pt_trades")
 class TestPaperTradingTrades:
     """Test trade history endpoints"""
 
     @pytest.fixture
-    def portfolio_with_trades(self):
+    def portfolio_with_trades(self, paper_trading, make_portfolio):
         """Create a portfolio with executed trades"""
-        portfolio_response = client.post(
-            "/api/paper-trading/portfolios",
-            json={"name": "Trade Test", "initial_balance": 100000}
-        )
-        portfolio_id = portfolio_response.json()["id"]
+        portfolio_id = make_portfolio("Trade Test", 100000)
 
         # Execute a market order (will create a trade)
-        client.post(
-            f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-            json={
-                "symbol": "BTC/USD",
-                "side": "buy",
-                "order_type": "market",
-                "quantity": 0.5
-            }
+        paper_trading.create_order(
+            portfolio_id,
+            CreateOrderRequest.model_validate_json(BUY_BTC_MARKET_HALF),
+            current_price=30000.0
         )
 
         return portfolio_id
 
-    def test_list_trades(self, portfolio_with_trades):
+    async def test_list_trades(self, aclient, portfolio_with_trades):
         """Test listing trade history"""
-        response = client.get(
+        response = await aclient.get(
             f"/api/paper-trading/portfolios/{portfolio_with_trades}/trades"
         )
 
@@ -230,44 +290,90 @@ class TestPaperTradingTrades:
         assert isinstance(data, list)
 
 
-def test_paper_trading_full_flow():
+@pytest.mark.xdist_group("pt_batch")
+async def test_paper_trading_full_flow(aclient):
     """Test complete paper trading flow"""
-    # 1. Create portfolio
-    portfolio_response = client.post(
-        "/api/paper-trading/portfolios",
-        json={"name": "Full Flow Test", "initial_balance": 100000}
-    )
-    assert portfolio_response.status_code == 201
-    portfolio_id = portfolio_response.json()["id"]
-    initial_balance = portfolio_response.json()["current_balance"]
-
-    # 2. Place buy order
-    buy_response = client.post(
-        f"/api/paper-trading/portfolios/{portfolio_id}/orders",
-        json={
-            "symbol": "BTC/USD",
-            "side": "buy",
-            "order_type": "market",
-            "quantity": 0.5
-        }
+    portfolio_path = "/portfolios/{0.id}"
+    response = await aclient.post(
+        "/api/paper-trading/batch",
+        json=[
+            # 1. Create portfolio
+            {"method": "POST", "path": "/portfolios", "json": {"name": "Full Flow Test", "initial_balance": 100000}},
+            # 2. Place buy order
+            {
+                "method": "POST",
+                "path": f"{portfolio_path}/orders",
+                "json": {"symbol": "BTC/USD", "side": "buy", "order_type": "market", "quantity": 0.5}
+            },
+            # 3. Check positions
+            {"method": "GET", "path": f"{portfolio_path}/positions"},
+            # 4. Check trades
+            {"method": "GET", "path": f"{portfolio_path}/trades"},
+        ]
     )
-    assert buy_response.status_code == 201
+    assert response.status_code == 200
+    portfolio, buy, positions, trades = response.json()
+
+    assert portfolio["status_code"] == 201
+    initial_balance = portfolio["body"]["current_balance"]
+
+    assert buy["status_code"] == 201
+
+    # Portfolio balance decreased
+    assert buy["body"]["portfolio_balance_after"] < initial_balance
 
-    # 3. Check portfolio balance decreased
-    portfolio_response = client.get(f"/api/paper-trading/portfolios/{portfolio_id}")
-    current_balance = portfolio_response.json()["current_balance"]
-    assert current_balance < initial_balance
+    assert positions["status_code"] == 200
 
-    # 4. Check positions
-    positions_response = client.get(
-        f"/api/paper-trading/portfolios/{portfolio_id}/positions"
+    assert trades["status_code"] == 200
+    assert len(trades["body"]) > 0
+
+
+@pytest.mark.xdist_group("pt_batch")
+async def test_batch_unresolved_reference(aclient):
+    """Test batch steps referencing a missing result are rejected"""
+    response = await aclient.post(
+        "/api/paper-trading/batch",
+        json=[{"method": "GET", "path": "/portfolios/{0.id}"}]
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.xdist_group("pt_batch")
+@pytest.mark.parametrize("path", [
+    "/../../api/health",
+    "/../strategy/backtest",
+    "/portfolios/../../strategy/execute",
+    "/%2e%2e/strategy/execute",
+    "//portfolios",
+    "portfolios",
+])
+async def test_batch_rejects_paths_outside_router(aclient, path):
+    """Test batch steps can't reach routes outside the paper trading API"""
+    response = await aclient.post(
+        "/api/paper-trading/batch",
+        json=[{"method": "GET", "path": path}]
     )
-    assert positions_response.status_code == 200
+    assert response.status_code == 400
+
+
+@pytest.mark.xdist_group("pt_batch")
+async def test_batch_rejects_unsafe_reference(aclient):
+    """Test referenced values can only fill a single plain path segment"""
+    response = await aclient.post(
+        "/api/paper-trading/batch",
+        json=[
+            {"method": "POST", "path": "/portfolios", "json": {"name": "../../health", "initial_balance": 1000}},
+            {"method": "GET", "path": "/portfolios/{0.name}"},
+        ]
+    )
+    assert response.status_code == 400
+
 
-    # 5. Check trades
-    trades_response = client.get(
-        f"/api/paper-trading/portfolios/{portfolio_id}/trades"
+@pytest.mark.xdist_group("pt_batch")
+async def test_batch_rejects_oversized_batch(aclient):
+    """Test batches over _MAX_BATCH_STEPS are rejected before any step runs"""
+    response = await aclient.post(
+        "/api/paper-trading/batch",
+        json=[{"method": "GET", "path": "/portfolios"}] * (paper_trading_endpoints._MAX_BATCH_STEPS + 1)
     )
-    assert trades_response.status_code == 200
-    trades = trades_response.json()
-    assert len(trades) > 0
+    assert response.status_code == 422
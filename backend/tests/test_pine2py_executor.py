@@ -0,0 +1,133 @@
+"""
+Tests for the pine2py execution runtime
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..pine2py.executor import crossover, crossunder, execute_translated_code
+from ..pine2py.translator import translate
+from ._pine import SMA_CROSSOVER, create_test_data
+
+
+class TestCrossings:
+    """Test crossover and crossunder"""
+
+    def test_crossover(self):
+        """Test a crossover is flagged only on the bar where a reaches b from below"""
+        a = np.array([1.0, 2.0, 3.0, 4.0, 3.0])
+        b = np.full(5, 2.5)
+
+        np.testing.assert_array_equal(crossover(a, b), [False, False, True, False, False])
+
+    def test_crossunder(self):
+        """Test a crossunder is flagged only on the bar where a reaches b from above"""
+        a = np.array([4.0, 3.0, 2.0, 1.0, 3.0])
+
+        np.testing.assert_array_equal(crossunder(a, 2.5), [False, False, True, False, False])
+
+    def test_warmup_nans(self):
+        """Test bars where either input is NaN never cross"""
+        a = np.array([np.nan, np.nan, 1.0, 3.0])
+        b = np.array([np.nan, 2.0, 2.0, 2.0])
+
+        np.testing.assert_array_equal(crossover(a, b), [False, False, False, True])
+
+    def test_series_inputs(self):
+        """Test Series are compared by position, not index alignment"""
+        a = pd.Series([1.0, 3.0], index=[10, 20])
+        b = pd.Series([2.0, 2.0], index=[0, 1])
+
+        np.testing.assert_array_equal(crossover(a, b), [False, True])
+
+    def test_translated_conditions(self):
+        """Test ta.crossover/ta.crossunder used as if conditions map to the helpers"""
+        code = translate(
+            "if ta.crossover(fast, slow)\n"
+            "    strategy.entry(\"Long\", strategy.long)\n"
+            "if ta.crossunder(fast, slow)\n"
+            "    strategy.close(\"Long\")\n"
+        )
+
+        assert "crossover(fast, slow)" in code
+        assert "crossunder(fast, slow)" in code
+        assert "ta.cross" not in code
+
+
+@pytest.fixture(scope="session")
+def sma_crossover_code():
+    """SMA crossover script translated once per worker"""
+    return translate(SMA_CROSSOVER)
+
+
+def _expected_order_bars(close: pd.Series, fast: int = 9, slow: int = 21):
+    """Bars where the 9/21 SMA crossover script enters and closes, from pandas rolling means"""
+    sma_fast = close.rolling(fast).mean()
+    sma_slow = close.rolling(slow).mean()
+    up = (sma_fast.shift(1) < sma_slow.shift(1)) & (sma_fast >= sma_slow)
+    down = (sma_fast.shift(1) > sma_slow.shift(1)) & (sma_fast <= sma_slow)
+
+    bars, position = [], 0
+    for i in range(len(close)):
+        if up.iloc[i]:
+            bars.append(i)
+            position += 1
+        if down.iloc[i] and position:
+            bars.append(i)
+            position = 0
+    return bars
+
+
+class TestTranslatedStrategy:
+    """Test translating and executing a Pine Script strategy end to end"""
+
+    @pytest.mark.parametrize("num_candles", [100, 1000, 10000])
+    def test_sma_crossover(self, sma_crossover_code, num_candles):
+        """Test orders are placed on exactly the bars where the SMAs cross"""
+        df = create_test_data(num_candles)
+
+        result = execute_translated_code(sma_crossover_code, df)
+
+        expected = _expected_order_bars(df["close"])
+        assert len(expected) > 0
+        assert [order.bar for order in result["orders"]] == expected
+
+
+class TestTranslateAndExecute:
+    """Test translated scripts actually trade"""
+
+    # SMA(2) and SMA(4) of this close cross up at bars 6 and 14, down at bar 10
+    CLOSE = [10.0, 9.0, 8.0, 7.0, 6.0, 7.0, 8.0, 9.0, 10.0, 9.0, 8.0, 7.0, 6.0, 7.0, 8.0]
+
+    @pytest.mark.parametrize("signals", [
+        # Crossings assigned to series first
+        "up = ta.crossover(sma_fast, sma_slow)\n"
+        "down = ta.crossunder(sma_fast, sma_slow)\n"
+        "if up\n"
+        "    strategy.entry(\"Long\", strategy.long)\n"
+        "if down\n"
+        "    strategy.close(\"Long\")\n",
+        # Crossings used directly as conditions
+        "if ta.crossover(sma_fast, sma_slow)\n"
+        "    strategy.entry(\"Long\", strategy.long)\n"
+        "if ta.crossunder(sma_fast, sma_slow)\n"
+        "    strategy.close(\"Long\")\n",
+    ])
+    def test_sma_crossings(self, signals):
+        """Test orders land on the bars where the SMAs cross"""
+        script = (
+            "//@version=5\n"
+            "strategy(\"Cross\")\n"
+            "fast = input.int(2)\n"
+            "slow = input.int(4)\n"
+            "sma_fast = ta.sma(close, fast)\n"
+            "sma_slow = ta.sma(close, slow)\n"
+        ) + signals
+
+        result = execute_translated_code(translate(script), pd.DataFrame({"close": self.CLOSE}))
+
+        orders = result["orders"]
+        assert [order.bar for order in orders] == [6, 10, 14]
+        assert [order.direction for order in orders] == ["long", "short", "long"]
+        assert result["positions"] == {"Long": 1.0}
@@ -0,0 +1,67 @@
+"""
+Tests for the NumPy/pandas TA-Lib fallbacks used by pine2py
+"""
+
+import numpy as np
+import pytest
+
+from ..pine2py import indicators
+
+
+@pytest.fixture
+def prices():
+    """Deterministic random-walk closes"""
+    rng = np.random.default_rng(42)
+    return 100 + np.cumsum(rng.standard_normal(200))
+
+
+class TestMovingAverages:
+    """Test SMA and EMA"""
+
+    def test_sma(self, prices):
+        """Test SMA matches a direct window mean after the warm-up"""
+        result = indicators.SMA(prices, timeperiod=10)
+
+        assert np.isnan(result[:9]).all()
+        assert result[9] == pytest.approx(prices[:10].mean())
+        assert result[-1] == pytest.approx(prices[-10:].mean())
+
+    def test_ema_seeded_with_sma(self, prices):
+        """Test EMA starts from the first window's mean and then recurses"""
+        result = indicators.EMA(prices, timeperiod=10)
+        alpha = 2 / 11
+
+        assert np.isnan(result[:9]).all()
+        assert result[9] == pytest.approx(prices[:10].mean())
+        assert result[10] == pytest.approx(alpha * prices[10] + (1 - alpha) * result[9])
+
+    def test_short_input(self):
+        """Test inputs shorter than the period are all NaN"""
+        assert np.isnan(indicators.EMA([1.0, 2.0], timeperiod=5)).all()
+        assert np.isnan(indicators.SMA([1.0, 2.0], timeperiod=5)).all()
+
+
+class TestOscillators:
+    """Test RSI and MACD"""
+
+    def test_rsi_bounds(self, prices):
+        """Test RSI warm-up and range"""
+        result = indicators.RSI(prices, timeperiod=14)
+
+        assert np.isnan(result[:14]).all()
+        assert ((result[14:] >= 0) & (result[14:] <= 100)).all()
+
+    def test_rsi_rising_prices(self):
+        """Test RSI is 100 when prices only rise"""
+        result = indicators.RSI(np.arange(30, dtype=float), timeperiod=14)
+
+        assert result[-1] == pytest.approx(100.0)
+
+    def test_macd(self, prices):
+        """Test MACD lines share one warm-up and hist is their difference"""
+        macd, signal, hist = indicators.MACD(prices, fastperiod=12, slowperiod=26, signalperiod=9)
+        warmup = 26 + 9 - 2
+
+        assert np.isnan(macd[:warmup]).all()
+        assert not np.isnan(macd[warmup:]).any()
+        np.testing.assert_allclose(hist[warmup:], macd[warmup:] - signal[warmup:])
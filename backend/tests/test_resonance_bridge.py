@@ -3,8 +3,12 @@ Unit tests for Resonance.ai Scanner integration
 Tests schema validation and error handling
 """
 
+import asyncio
+
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch
+import pytest_asyncio
+import respx
 from pydantic import ValidationError
 
 from ..bridges.resonance_bridge import ResonanceBridge, ResonanceAlert
@@ -50,61 +54,75 @@ class TestResonanceAlert:
             "confidence": 1.5  # Invalid: > 1.0
         }
 
-        # Note: Current schema doesn't enforce range, but should
-        # This test documents expected behavior
-        alert = ResonanceAlert(**data)
-        assert alert.confidence == 1.5
+        with pytest.raises(ValidationError):
+            ResonanceAlert(**data)
+
+
+HEALTH_URL = r".*/health$"
+ALERTS_URL = r".*/api/alerts.*"
+
+SINGLE_ALERT = {
+    "alerts": [
+        {
+            "time": 1609459200,
+            "symbol": "BTC/USD",
+            "signal": "breakout",
+            "confidence": 0.95
+        }
+    ]
+}
 
 
 class TestResonanceBridge:
     """Test ResonanceBridge integration"""
 
-    @pytest.fixture
-    async def bridge(self):
-        """Create bridge instance"""
+    @pytest_asyncio.fixture(scope="session")
+    async def connected_bridge(self):
+        """Bridge connected once, so its connection pool is shared by all tests"""
         bridge = ResonanceBridge()
         await bridge.connect()
         yield bridge
         await bridge.disconnect()
 
-    @pytest.mark.asyncio
-    async def test_connect_disconnect(self, bridge):
+    @pytest.fixture
+    def bridge(self, connected_bridge):
+        """Shared bridge with an empty alert cache"""
+        connected_bridge._cache.clear()
+        return connected_bridge
+
+    @pytest.fixture
+    def mock_http(self):
+        """Intercept httpx requests at the transport level"""
+        with respx.mock(assert_all_called=False) as m:
+            yield m
+
+    async def test_connect_disconnect(self):
         """Test session lifecycle"""
+        bridge = ResonanceBridge()
+        await bridge.connect()
         assert bridge.session is not None
         await bridge.disconnect()
-        # Session should be closed (check internal state)
+        assert bridge.session.is_closed
 
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_health_check_success(self, mock_get, bridge):
+    async def test_health_check_success(self, bridge, mock_http):
         """Test successful health check"""
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_get.return_value.__aenter__.return_value = mock_response
+        mock_http.head(url__regex=HEALTH_URL).respond(200)
 
         status = await bridge.health_check()
 
         assert status == "healthy"
 
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_health_check_failure(self, mock_get, bridge):
+    async def test_health_check_failure(self, bridge, mock_http):
         """Test health check when service is down"""
-        mock_response = AsyncMock()
-        mock_response.status = 503
-        mock_get.return_value.__aenter__.return_value = mock_response
+        mock_http.head(url__regex=HEALTH_URL).respond(503)
 
         status = await bridge.health_check()
 
         assert "unhealthy" in status
 
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_get_alerts_success(self, mock_get, bridge):
+    async def test_get_alerts_success(self, bridge, mock_http):
         """Test fetching alerts with valid response"""
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value={
+        mock_http.get(url__regex=ALERTS_URL).respond(json={
             "alerts": [
                 {
                     "time": 1609459200,
@@ -120,7 +138,6 @@ class TestResonanceBridge:
                 }
             ]
         })
-        mock_get.return_value.__aenter__.return_value = mock_response
 
         alerts = await bridge.get_alerts(symbol="BTC/USD")
 
@@ -128,13 +145,9 @@ class TestResonanceBridge:
         assert alerts[0].signal == "breakout"
         assert alerts[1].symbol == "ETH/USD"
 
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_get_alerts_schema_mismatch(self, mock_get, bridge):
+    async def test_get_alerts_schema_mismatch(self, bridge, mock_http):
         """Test error handling when schema changes"""
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value={
+        mock_http.get(url__regex=ALERTS_URL).respond(json={
             "alerts": [
                 {
                     "timestamp": 1609459200,  # Changed field name!
@@ -143,28 +156,13 @@ class TestResonanceBridge:
                 }
             ]
         })
-        mock_get.return_value.__aenter__.return_value = mock_response
 
         with pytest.raises(RuntimeError, match="schema changed"):
             await bridge.get_alerts()
 
-    @pytest.mark.asyncio
-    @patch('aiohttp.ClientSession.get')
-    async def test_alerts_caching(self, mock_get, bridge):
+    async def test_alerts_caching(self, bridge, mock_http):
         """Test alert response caching"""
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.json = AsyncMock(return_value={
-            "alerts": [
-                {
-                    "time": 1609459200,
-                    "symbol": "BTC/USD",
-                    "signal": "breakout",
-                    "confidence": 0.95
-                }
-            ]
-        })
-        mock_get.return_value.__aenter__.return_value = mock_response
+        mock_http.get(url__regex=ALERTS_URL).respond(json=SINGLE_ALERT)
 
         # First call - should hit API
         alerts1 = await bridge.get_alerts(symbol="BTC/USD", limit=10)
@@ -174,4 +172,66 @@ class TestResonanceBridge:
 
         assert alerts1 == alerts2
         # API should only be called once due to caching
-        assert mock_get.call_count == 1
+        assert mock_http.calls.call_count == 1
+
+    async def test_concurrent_alerts_share_request(self, bridge, mock_http):
+        """Test concurrent identical requests are coalesced into one API call"""
+        async def slow_response(request):
+            await asyncio.sleep(0)  # Let the second caller start while in flight
+            return httpx.Response(200, json=SINGLE_ALERT)
+
+        mock_http.get(url__regex=ALERTS_URL).mock(side_effect=slow_response)
+
+        alerts1, alerts2 = await asyncio.gather(
+            bridge.get_alerts(symbol="BTC/USD", limit=10),
+            bridge.get_alerts(symbol="BTC/USD", limit=10)
+        )
+
+        assert alerts1 == alerts2
+        assert mock_http.calls.call_count == 1
+
+    async def test_cancelled_caller_does_not_cancel_waiters(self, bridge, mock_http):
+        """Test cancelling the caller that started a fetch leaves other waiters unaffected"""
+        release = asyncio.Event()
+
+        async def slow_response(request):
+            await release.wait()
+            return httpx.Response(200, json=SINGLE_ALERT)
+
+        mock_http.get(url__regex=ALERTS_URL).mock(side_effect=slow_response)
+
+        first = asyncio.ensure_future(bridge.get_alerts(symbol="BTC/USD", limit=10))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(bridge.get_alerts(symbol="BTC/USD", limit=10))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+
+        alerts = await second
+        assert alerts[0].symbol == "BTC/USD"
+        assert mock_http.calls.call_count == 1
+
+    async def test_overlapping_alerts_are_interned(self, bridge, mock_http):
+        """Test the same alert from different queries is one shared object"""
+        mock_http.get(url__regex=ALERTS_URL).respond(json=SINGLE_ALERT)
+
+        alerts1 = await bridge.get_alerts(symbol="BTC/USD", limit=10)
+        alerts2 = await bridge.get_alerts(symbol="BTC/USD", limit=20)
+
+        assert mock_http.calls.call_count == 2
+        assert alerts1[0] is alerts2[0]
+
+    async def test_alerts_cache_evicts_least_recent(self, bridge, mock_http, monkeypatch):
+        """Test the alert cache stays bounded by evicting the oldest entry"""
+        mock_http.get(url__regex=ALERTS_URL).respond(json=SINGLE_ALERT)
+        monkeypatch.setattr(bridge, "_cache_maxsize", 2)
+
+        await bridge.get_alerts(symbol="BTC/USD")
+        await bridge.get_alerts(symbol="ETH/USD")
+        await bridge.get_alerts(symbol="SOL/USD")
+
+        assert len(bridge._cache) == 2
+        assert "BTC/USD:None:None:100" not in bridge._cache
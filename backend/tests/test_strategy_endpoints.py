@@ -0,0 +1,299 @@
+"""
+Tests for strategy execution and backtesting
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..api import strategy_endpoints
+from ..api.strategy_endpoints import (
+    _compile_strategy, _execute_strategy, _simulate_trades, _unix_seconds
+)
+
+
+@pytest.fixture
+def candles():
+    """Hourly candles with a steadily rising close"""
+    n = 50
+    return pd.DataFrame({
+        "time": 1609459200 + np.arange(n) * 3600,
+        "open": 100.0 + np.arange(n),
+        "high": 101.0 + np.arange(n),
+        "low": 99.0 + np.arange(n),
+        "close": 100.0 + np.arange(n),
+        "volume": 0
+    })
+
+
+class TestExecuteStrategy:
+    """Test running user strategy code"""
+
+    def test_list_signals(self, candles):
+        """Test strategies returning a list of signal dicts"""
+        code = (
+            "def strategy(df):\n"
+            "    return [{'time': int(df['time'].iloc[0]), 'side': 'buy'}]\n"
+        )
+        signals = _execute_strategy(code, candles)
+
+        assert signals == [{"time": int(candles["time"].iloc[0]), "side": "buy"}]
+
+    def test_array_signals(self, candles):
+        """Test strategies returning one signal per candle"""
+        code = (
+            "def strategy(df):\n"
+            "    return np.where(df['close'] > df['close'].shift(1), 1, 0)\n"
+        )
+        signals = _execute_strategy(code, candles)
+
+        assert isinstance(signals, np.ndarray)
+        assert len(signals) == len(candles)
+
+    def test_strategy_cannot_modify_data(self, candles):
+        """Test writes made by a strategy don't reach the caller's candles"""
+        code = (
+            "def strategy(df):\n"
+            "    df.loc[0, 'close'] = -1.0\n"
+            "    df['close'] *= 2\n"
+            "    df['signal'] = 1\n"
+            "    return []\n"
+        )
+        original = candles.copy()
+
+        _execute_strategy(code, candles)
+
+        pd.testing.assert_frame_equal(candles, original)
+
+    def test_compiled_code_is_reused(self, candles):
+        """Test rerunning a strategy doesn't recompile its source"""
+        code = "def strategy(df):\n    return []\n"
+
+        _execute_strategy(code, candles)
+        _execute_strategy(code, candles)
+
+        assert _compile_strategy(code) is _compile_strategy(code)
+
+    def test_builtins_changes_do_not_leak(self, candles):
+        """Test a strategy editing its builtins doesn't affect later runs"""
+        code = (
+            "def strategy(df):\n"
+            "    __builtins__['len'] = None\n"
+            "    return []\n"
+        )
+        _execute_strategy(code, candles)
+
+        signals = _execute_strategy("def strategy(df):\n    return [len(df)]\n", candles)
+
+        assert signals == [len(candles)]
+
+    def test_bool_signals(self, candles):
+        """Test boolean signal arrays are treated as buys"""
+        code = "def strategy(df):\n    return (df['close'] % 10 == 0).to_numpy()\n"
+
+        signals = _execute_strategy(code, candles)
+
+        assert signals.dtype == np.int8
+        np.testing.assert_array_equal(signals, (candles["close"] % 10 == 0).astype(np.int8))
+
+    def test_nan_signals_are_holds(self, candles):
+        """Test NaN entries such as the first value of .diff() are not signals"""
+        code = "def strategy(df):\n    return np.sign(df['close'].diff())\n"
+
+        signals = _execute_strategy(code, candles)
+
+        assert signals[0] == 0
+        assert not np.isnan(signals).any()
+
+    def test_non_numeric_signals(self, candles):
+        """Test string signal arrays are rejected with a clear message"""
+        code = "def strategy(df):\n    return np.array(['buy'] * len(df))\n"
+
+        with pytest.raises(ValueError, match="must be numeric or boolean"):
+            _execute_strategy(code, candles)
+
+    def test_syntax_error(self, candles):
+        """Test invalid strategy source is reported as an execution error"""
+        with pytest.raises(ValueError, match="Strategy execution error"):
+            _execute_strategy("def strategy(df) return []", candles)
+
+    def test_array_length_mismatch(self, candles):
+        """Test signal arrays must line up with the candles"""
+        code = "def strategy(df):\n    return np.zeros(3)\n"
+
+        with pytest.raises(ValueError, match="one entry per candle"):
+            _execute_strategy(code, candles)
+
+
+class TestSimulateTrades:
+    """Test trade simulation and performance metrics"""
+
+    def test_array_matches_list_signals(self, candles):
+        """Test array signals backtest the same as equivalent signal dicts"""
+        signals = np.zeros(len(candles), dtype=np.int8)
+        signals[[2, 10, 20]] = 1
+        signals[[5, 15, 30]] = -1
+        as_list = [
+            {"time": int(candles["time"].iloc[i]), "side": "buy" if signals[i] > 0 else "sell"}
+            for i in np.flatnonzero(signals)
+        ]
+
+        from_array = _simulate_trades(signals, candles, 10000.0)
+        from_list = _simulate_trades(as_list, candles, 10000.0)
+
+        assert from_array == from_list
+        assert from_array.total_trades == 3
+        assert from_array.winning_trades == 3
+
+    def test_unknown_time_is_skipped(self, candles):
+        """Test signals without a matching candle are ignored"""
+        result = _simulate_trades([{"time": 0, "side": "buy"}], candles, 10000.0)
+
+        assert result.total_trades == 0
+        assert result.total_return == 0
+
+
+class TestMarkerTimes:
+    """Test signal time conversion for chart markers"""
+
+    def test_numbers(self):
+        """Test numeric times are truncated to whole seconds"""
+        assert _unix_seconds([1609459200, 1609459201.7]) == [1609459200, 1609459201]
+
+    def test_timestamps(self):
+        """Test pandas Timestamps convert like Timestamp.timestamp()"""
+        times = [pd.Timestamp("2021-01-01"), pd.Timestamp("2021-01-01 01:00", tz="US/Eastern")]
+
+        assert _unix_seconds(times) == [int(t.timestamp()) for t in times]
+
+    def test_mixed(self):
+        """Test mixed numbers and Timestamps are converted individually"""
+        assert _unix_seconds([1, pd.Timestamp("2021-01-01")]) == [1, 1609459200]
+
+
+class TestBacktestBatch:
+    """Test running several backtests in one request"""
+
+    async def test_shared_data_fetch(self, aclient, candles, monkeypatch):
+        """Test identical data ranges are fetched once and results keep request order"""
+        fetches = []
+
+        async def fake_fetch(symbol, timeframe, start_date, end_date):
+            fetches.append(symbol)
+            return candles
+
+        monkeypatch.setattr(strategy_endpoints, "_fetch_historical_data", fake_fetch)
+
+        buy_and_sell = (
+            "def strategy(df):\n"
+            "    signals = np.zeros(len(df))\n"
+            "    signals[0], signals[-1] = 1, -1\n"
+            "    return signals\n"
+        )
+        hold = "def strategy(df):\n    return []\n"
+        request = {
+            "symbol": "BTC/USD",
+            "start_date": "2021-01-01",
+            "end_date": "2021-01-03",
+            "initial_balance": 1000.0
+        }
+
+        response = await aclient.post(
+            "/api/strategy/backtest/batch",
+            json=[
+                {**request, "strategy_code": buy_and_sell},
+                {**request, "strategy_code": hold},
+                {**request, "symbol": "ETH/USD", "strategy_code": buy_and_sell},
+            ]
+        )
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["total_trades"] for r in results] == [1, 0, 1]
+        assert sorted(fetches) == ["BTC/USD", "ETH/USD"]
+
+    async def test_fetch_concurrency_is_bounded(self, aclient, candles, monkeypatch):
+        """Test no more than _MAX_CONCURRENT_FETCHES data fetches run at once"""
+        in_flight = peak = 0
+
+        async def fake_fetch(symbol, timeframe, start_date, end_date):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return candles
+
+        monkeypatch.setattr(strategy_endpoints, "_fetch_historical_data", fake_fetch)
+
+        requests = [
+            {
+                "strategy_code": "def strategy(df):\n    return []\n",
+                "symbol": f"COIN{i}/USD",
+                "start_date": "2021-01-01",
+                "end_date": "2021-01-03"
+            }
+            for i in range(strategy_endpoints._MAX_CONCURRENT_FETCHES * 2)
+        ]
+        response = await aclient.post("/api/strategy/backtest/batch", json=requests)
+
+        assert response.status_code == 200
+        assert len(response.json()) == len(requests)
+        assert peak == strategy_endpoints._MAX_CONCURRENT_FETCHES
+
+    async def test_backtests_run_serially_off_the_event_loop(self, aclient, candles, monkeypatch):
+        """Test batch backtests run in worker threads, one at a time"""
+        loop_thread = threading.get_ident()
+        threads = []
+        in_flight = peak = 0
+        lock = threading.Lock()
+        run_backtest = strategy_endpoints._run_backtest
+
+        def tracked_run_backtest(request, data):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            threads.append(threading.get_ident())
+            try:
+                return run_backtest(request, data)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        async def fake_fetch(symbol, timeframe, start_date, end_date):
+            return candles
+
+        monkeypatch.setattr(strategy_endpoints, "_fetch_historical_data", fake_fetch)
+        monkeypatch.setattr(strategy_endpoints, "_run_backtest", tracked_run_backtest)
+
+        request = {
+            "strategy_code": "def strategy(df):\n    return []\n",
+            "symbol": "BTC/USD",
+            "start_date": "2021-01-01",
+            "end_date": "2021-01-03"
+        }
+        response = await aclient.post("/api/strategy/backtest/batch", json=[request] * 4)
+
+        assert response.status_code == 200
+        assert len(threads) == 4
+        assert loop_thread not in threads
+        assert peak == 1
+
+    async def test_batch_size_limit(self, aclient):
+        """Test batches over _MAX_BATCH_BACKTESTS are rejected before any work"""
+        request = {
+            "strategy_code": "def strategy(df):\n    return []\n",
+            "symbol": "BTC/USD",
+            "start_date": "2021-01-01",
+            "end_date": "2021-01-03"
+        }
+        response = await aclient.post(
+            "/api/strategy/backtest/batch",
+            json=[request] * (strategy_endpoints._MAX_BATCH_BACKTESTS + 1)
+        )
+
+        assert response.status_code == 422
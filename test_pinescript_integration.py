@@ -5,6 +5,7 @@ Tests the complete workflow: Translation → Execution → Results
 """
 
 import sys
+import traceback
 import pandas as pd
 import numpy as np
 from backend.pine2py.translator import translate
@@ -35,18 +36,25 @@ plot(sma_slow)
 
 def create_test_data(num_candles=100):
     """Create synthetic OHLCV data for testing"""
-    dates = pd.date_range(start='2024-01-01', periods=num_candles, freq='1H')
+    # Hourly timestamps straight from an int64 range
+    dates = pd.DatetimeIndex(np.datetime64('2024-01-01T00', 'h') + np.arange(num_candles))
+
+    # Draw all the noise in one block: close steps, open jitter, high and low wicks
+    rng = np.random.default_rng(42)
+    noise = rng.standard_normal((num_candles, 4))
 
     # Generate realistic price movement
-    np.random.seed(42)
-    close_prices = 100 + np.cumsum(np.random.randn(num_candles) * 2)
+    close_prices = np.cumsum(noise[:, 0] * 2)
+    close_prices += 100
+    wicks = np.abs(noise[:, 2:], out=noise[:, 2:])
+    wicks *= 1.5
 
     df = pd.DataFrame({
-        'open': close_prices + np.random.randn(num_candles) * 0.5,
-        'high': close_prices + abs(np.random.randn(num_candles)) * 1.5,
-        'low': close_prices - abs(np.random.randn(num_candles)) * 1.5,
+        'open': close_prices + noise[:, 1] * 0.5,
+        'high': close_prices + wicks[:, 0],
+        'low': close_prices - wicks[:, 1],
         'close': close_prices,
-        'volume': np.random.randint(1000, 10000, num_candles)
+        'volume': rng.integers(1000, 10000, num_candles)
     }, index=dates)
 
     return df
@@ -96,7 +104,8 @@ def main():
         if orders:
             print("\n   Sample Orders (first 5):")
             for i, order in enumerate(orders[:5]):
-                print(f"     {i+1}. {order.get('type', 'N/A')} {order.get('direction', 'N/A')} @ {order.get('price', 0):.2f}")
+                price = f"{order.price:.2f}" if order.price is not None else "market"
+                print(f"     {i+1}. {order.id} {order.direction} {order.qty:g} @ {price}")
 
         # Show indicators
         indicators = result.get('indicators', {})
@@ -108,7 +117,6 @@ def main():
 
     except Exception as e:
         print(f"   ✗ Execution failed: {e}")
-        import traceback
         traceback.print_exc()
         return 1
 